@@ -1,14 +1,9 @@
-import os, sys, datetime as dt, calendar
+import datetime as dt, calendar
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import count_distinct_sql, read_one, read_sql, use_hll
 
 st.set_page_config(page_title="Real-time Monitor", layout="wide")
 st.title("Real-time Business Performance Monitor")
@@ -23,15 +18,15 @@ refresh_ttl = st.sidebar.slider("Data refresh (seconds)", 10, 600, 60)
 
 @st.cache_data(ttl=refresh_ttl)
 def mtd_metrics(start: str, end: str):
-    sql = """
+    sql = f"""
         SELECT SUM(t.revenue) AS revenue,
-               COUNT(DISTINCT t.customer_id) AS customers,
+               {count_distinct_sql('t.customer_id')} AS customers,
                COUNT(*) AS orders
         FROM transactions t
         JOIN time_dimension d ON d.date_key = t.date_key
         WHERE d.date BETWEEN %s AND %s
     """
-    row = read_sql(sql, [start, end]).iloc[0]
+    row = read_one(sql, [start, end])
     return float(row["revenue"] or 0), int(row["customers"] or 0), int(row["orders"] or 0)
 
 rev, cust, orders = mtd_metrics(month_start.isoformat(), today.isoformat())
@@ -39,7 +34,7 @@ run_rate = rev / max(1, today.day) * days_in_month
 
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Revenue MTD", f"₹{rev:,.0f}", delta=f"Run-rate ₹{run_rate:,.0f}")
-col2.metric("Active Customers MTD", f"{cust:,}")
+col2.metric("Active Customers MTD", f"{cust:,}", help="HyperLogLog estimate (~1% error)" if use_hll() else None)
 col3.metric("Orders MTD", f"{orders:,}")
 ach = 0 if target_rev == 0 else (rev/target_rev*100)
 col4.metric("Target Achieved", f"{ach:.1f}%")
@@ -61,5 +56,6 @@ def daily_revenue_month(year: int, month: int):
 
 dr = daily_revenue_month(today.year, today.month)
 if not dr.empty:
+    # at most 31 daily rows, so no downsampling is needed
     st.plotly_chart(px.bar(dr, x="date", y="revenue", title="Daily Revenue (Current Month)"), use_container_width=True)
 
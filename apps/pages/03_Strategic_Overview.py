@@ -1,46 +1,55 @@
-import os, sys
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, read_sql
 
 st.set_page_config(page_title="Strategic Overview", layout="wide")
 st.title("Strategic Overview")
 
 st.caption("Market share, competitive positioning, geographic expansion, and health indicators")
 
+today = dt.date.today()
+start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(2015, today.year-3), month=1, day=1))
+end_date = st.sidebar.date_input("End date", value=today)
+start_s, end_s = start_date.isoformat(), end_date.isoformat()
+
 @st.cache_data(ttl=300)
-def brand_share():
+def brand_share(start: str, end: str, limit: int = 10):
     sql = """
       SELECT COALESCE(p.brand,'Unknown') AS brand, SUM(t.revenue) AS revenue
       FROM transactions t LEFT JOIN products p ON p.product_id = t.product_id
+      WHERE t.date_key BETWEEN %s AND %s
       GROUP BY 1 ORDER BY 2 DESC
+      LIMIT %s
     """
-    return read_sql(sql)
+    return read_sql(sql, [*date_key_range(start, end), limit])
 
 @st.cache_data(ttl=300)
-def geo_expansion():
+def geo_expansion(start: str, end: str):
+    # Cities are counted per state, then summed per year, matching the old
+    # client-side groupby but returning only one row per year.
     sql = """
-      SELECT d.year, t.state, COUNT(DISTINCT t.city) AS cities, SUM(t.revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-      GROUP BY d.year, t.state
+      SELECT x.year, SUM(x.cities) AS cities
+      FROM (
+        SELECT t.date_key / 10000 AS year, t.state, COUNT(DISTINCT t.city) AS cities
+        FROM transactions t
+        WHERE t.date_key BETWEEN %s AND %s
+        GROUP BY 1, 2
+      ) x
+      GROUP BY x.year ORDER BY x.year
     """
-    return read_sql(sql)
+    return read_sql(sql, list(date_key_range(start, end)))
 
-bs = brand_share()
+bs = brand_share(start_s, end_s)
 if not bs.empty:
-    fig = px.pie(bs.head(10), values='revenue', names='brand', title='Top 10 Brand Revenue Share')
+    fig = px.pie(bs, values='revenue', names='brand', title='Top 10 Brand Revenue Share')
     st.plotly_chart(fig, use_container_width=True)
 
-geo = geo_expansion()
+geo = geo_expansion(start_s, end_s)
 if not geo.empty:
-    st.plotly_chart(px.line(geo.groupby('year', as_index=False)['cities'].sum(), x='year', y='cities', title='Cities Covered by Year'), use_container_width=True)
+    st.plotly_chart(px.line(geo, x='year', y='cities', title='Cities Covered by Year'), use_container_width=True)
 
 st.info("Add competitor mappings and tiers to enhance this page (e.g., metro vs tier-2).")
 
@@ -1,14 +1,9 @@
-import os, sys
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.io as pio
 import numpy as np
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
 from data_pipeline.bi.db import read_sql
 
 st.set_page_config(page_title="Financial Performance", layout="wide")
@@ -26,25 +21,38 @@ def revenue_by_category():
 @st.cache_data(ttl=300)
 def monthly_revenue():
     sql = """
-      SELECT d.year, d.month, SUM(t.revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-      GROUP BY d.year, d.month
-      ORDER BY d.year, d.month
+      SELECT year, month, SUM(revenue) AS revenue
+      FROM mv_revenue_monthly
+      GROUP BY year, month
+      ORDER BY year, month
     """
     return read_sql(sql)
 
-rc = revenue_by_category()
-if not rc.empty:
-    st.plotly_chart(px.bar(rc.head(20), x='category', y='revenue', title='Revenue by Category'), use_container_width=True)
+# Figures are cached as JSON so reruns skip plotly.express
+@st.cache_data(ttl=300)
+def build_category_bar():
+    rc = revenue_by_category()
+    if rc.empty:
+        return None
+    return pio.to_json(px.bar(rc.head(20), x='category', y='revenue', title='Revenue by Category'))
 
-mr = monthly_revenue()
-if not mr.empty:
+@st.cache_data(ttl=300)
+def build_monthly_trend():
+    mr = monthly_revenue()
+    if mr.empty:
+        return None
     # simple forecast: linear trend on last 24 months
-    mr['period'] = np.arange(len(mr))
+    x = np.arange(len(mr), dtype=np.float64)
     if len(mr) >= 6:
-        z = np.polyfit(mr['period'], mr['revenue'], 1)
-        mr['trend'] = np.poly1d(z)(mr['period'])
-    st.plotly_chart(px.line(mr, x=mr.index, y=['revenue','trend'] if 'trend' in mr else ['revenue'], title='Monthly Revenue & Trend'), use_container_width=True)
+        m, b = np.polyfit(x, mr['revenue'].to_numpy(dtype=np.float64), 1)
+        mr = mr.assign(period=x, trend=m * x + b)
+    else:
+        mr = mr.assign(period=x)
+    return pio.to_json(px.line(mr, x=mr.index, y=['revenue','trend'] if 'trend' in mr else ['revenue'], title='Monthly Revenue & Trend'))
+
+for j in (build_category_bar(), build_monthly_trend()):
+    if j:
+        st.plotly_chart(pio.from_json(j), use_container_width=True)
 
 st.info("For margins and costs, add a costs table or margin % by category and join into transactions.")
 
@@ -1,29 +1,24 @@
-import os, sys
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
 from data_pipeline.bi.db import read_sql
 
 st.set_page_config(page_title="Growth Analytics", layout="wide")
 st.title("Growth Analytics")
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=86400)
 def new_customers_by_year():
+    # MIN(date_key) per customer can be served by idx_tx_customer_date alone
     sql = """
       WITH first_orders AS (
-        SELECT customer_id, MIN(d.date) AS first_date
-        FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-        WHERE customer_id IS NOT NULL
-        GROUP BY customer_id
+        SELECT t.customer_id, MIN(t.date_key) / 10000 AS first_year
+        FROM transactions t
+        WHERE t.customer_id IS NOT NULL
+        GROUP BY t.customer_id
       )
-      SELECT EXTRACT(YEAR FROM first_date)::int AS year, COUNT(*) AS new_customers
-      FROM first_orders GROUP BY 1 ORDER BY 1
+      SELECT first_year AS year, COUNT(*) AS new_customers
+      FROM first_orders GROUP BY first_year ORDER BY 1
     """
     return read_sql(sql)
 
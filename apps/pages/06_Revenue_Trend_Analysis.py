@@ -1,32 +1,15 @@
-import os, sys, datetime as dt
+import datetime as dt
 import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, read_sql
+from data_pipeline.bi.queries import categories
 
 st.set_page_config(page_title="Revenue Trend Analysis", layout="wide")
 st.title("Revenue Trend Analysis")
 
-@st.cache_data(ttl=300)
-def categories():
-    try:
-        df = read_sql("""
-           SELECT DISTINCT category FROM products WHERE category IS NOT NULL
-           UNION
-           SELECT DISTINCT category FROM transactions WHERE category IS NOT NULL
-           ORDER BY 1
-        """)
-        return df["category"].dropna().tolist()
-    except Exception:
-        return []
-
 freq = st.sidebar.radio("Frequency", ["Monthly", "Quarterly", "Yearly"], index=0)
 today = dt.date.today()
 start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(2015, today.year-3), month=1, day=1))
@@ -37,26 +20,27 @@ cats = None if ("All" in cat_sel or not cat_sel) else cat_sel
 
 def freq_cols():
     if freq == "Monthly":
-        return "d.year, d.month", ["year", "month"], "month"
+        return "year, month", ["year", "month"], "month"
     if freq == "Quarterly":
-        return "d.year, d.quarter", ["year", "quarter"], "quarter"
-    return "d.year", ["year"], None
+        return "year, (month - 1) / 3 + 1 AS quarter", ["year", "quarter"], "quarter"
+    return "year", ["year"], None
 
 keys, cols, label = freq_cols()
+groups = ", ".join(str(i) for i in range(1, len(cols) + 1))
+# mv_revenue_monthly is monthly, so the range is applied at month granularity
+month_range = [k // 100 for k in date_key_range(start_date.isoformat(), end_date.isoformat())]
 where_cat = ""
-params = [start_date.isoformat(), end_date.isoformat()]
+params = list(month_range)
 if cats:
-    where_cat = " AND COALESCE(p.category, t.category) = ANY(%s)"
+    where_cat = " AND category = ANY(%s)"
     params.append(cats)
 
 sql = f"""
-  SELECT {keys}, SUM(t.revenue) AS revenue
-  FROM transactions t
-  JOIN time_dimension d ON d.date_key = t.date_key
-  LEFT JOIN products p ON p.product_id = t.product_id
-  WHERE d.date BETWEEN %s AND %s {where_cat}
-  GROUP BY {keys}
-  ORDER BY {keys}
+  SELECT {keys}, SUM(revenue) AS revenue
+  FROM mv_revenue_monthly
+  WHERE year * 100 + month BETWEEN %s AND %s {where_cat}
+  GROUP BY {groups}
+  ORDER BY {groups}
 """
 df = read_sql(sql, params)
 
@@ -64,21 +48,22 @@ if df.empty:
     st.warning("No data for selected filters.")
     st.stop()
 
-df["period_idx"] = np.arange(len(df))
+x_idx = np.arange(len(df), dtype=np.float64)
 if len(df) >= 2:
-    z = np.polyfit(df["period_idx"], df["revenue"], 1)
-    df["trend"] = np.poly1d(z)(df["period_idx"])
+    m, b = np.polyfit(x_idx, df["revenue"].to_numpy(dtype=np.float64), 1)
+    df = df.assign(period_idx=x_idx, trend=m * x_idx + b)
+else:
+    df = df.assign(period_idx=x_idx)
 
 if label:
     title = f"Revenue by {label.title()}"
 else:
     title = "Revenue by Year"
 
-fig = px.line(df, x=cols, y="revenue", markers=True, title=title)
+x = df[cols[0]] if len(cols) == 1 else df[cols].astype(str).agg("-".join, axis=1)
+fig = px.line(df, x=x, y="revenue", markers=True, title=title, labels={"x": "period"})
 if "trend" in df.columns:
-    fig2 = px.line(df, x=cols, y="trend")
-    for tr in fig2.data:
-        fig.add_trace(tr)
+    fig.add_scatter(x=x, y=df["trend"], mode="lines", name="Trend")
 st.plotly_chart(fig, use_container_width=True)
 
 # Growth rates
@@ -87,23 +72,10 @@ df["growth_pct"] = (df["revenue"] - df["prev"]) / df["prev"] * 100
 st.subheader("Growth Rates")
 st.dataframe(df[cols + ["revenue", "growth_pct"]].round(2))
 
-# Seasonal variation (monthly average across years)
+# Seasonal variation (monthly average across years); the monthly frame above
+# already has one row per (year, month), so no second query is needed
 if freq == "Monthly":
-    sql2 = f"""
-      SELECT d.month, AVG(x.rev) AS avg_month_rev
-      FROM (
-        SELECT d.year, d.month, SUM(t.revenue) AS rev
-        FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-        LEFT JOIN products p ON p.product_id = t.product_id
-        WHERE d.date BETWEEN %s AND %s {where_cat}
-        GROUP BY d.year, d.month
-      ) x JOIN time_dimension d ON TRUE
-      GROUP BY d.month ORDER BY d.month
-    """
-    params2 = [start_date.isoformat(), end_date.isoformat()]
-    if cats:
-        params2.append(cats)
-    mon = read_sql(sql2, params2)
+    mon = df.groupby("month", as_index=False)["revenue"].mean().rename(columns={"revenue": "avg_month_rev"})
     if not mon.empty:
         st.subheader("Seasonal Pattern (Avg by Month)")
         st.plotly_chart(px.bar(mon, x="month", y="avg_month_rev"), use_container_width=True)
@@ -1,14 +1,10 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.io as pio
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, read_sql
 
 st.set_page_config(page_title="Category Performance", layout="wide")
 st.title("Category Performance")
@@ -19,45 +15,59 @@ end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
 @st.cache_data(ttl=300)
-def revenue_share(start: str, end: str):
-    sql = """
-      SELECT COALESCE(p.category, t.category, 'Unknown') AS category, SUM(t.revenue) AS revenue
-      FROM transactions t LEFT JOIN products p ON p.product_id = t.product_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1 ORDER BY 2 DESC
-    """
-    return read_sql(sql, [start, end])
+def category_breakdown(start: str, end: str):
+    """Revenue share and yearly trend per category from a single fact scan.
 
-@st.cache_data(ttl=300)
-def category_trend(start: str, end: str):
+    ``GROUPING SETS`` returns both (year, category) and (category) totals; the
+    ``g`` flag tells them apart so they can be split client-side.
+    """
     sql = """
-      SELECT d.year, COALESCE(p.category, t.category, 'Unknown') AS category, SUM(t.revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
+      SELECT t.date_key / 10000 AS year,
+             COALESCE(p.category, t.category, 'Unknown') AS category,
+             SUM(t.revenue) AS revenue,
+             GROUPING(t.date_key / 10000) AS g
+      FROM transactions t
       LEFT JOIN products p ON p.product_id = t.product_id
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1, 2 ORDER BY 1
+      WHERE t.date_key BETWEEN %s AND %s
+      GROUP BY GROUPING SETS (
+        (t.date_key / 10000, COALESCE(p.category, t.category, 'Unknown')),
+        (COALESCE(p.category, t.category, 'Unknown'))
+      )
     """
-    return read_sql(sql, [start, end])
+    df = read_sql(sql, list(date_key_range(start, end)))
+    share = (df[df['g'] == 1].drop(columns=['year', 'g'])
+             .sort_values('revenue', ascending=False).reset_index(drop=True))
+    trend = df[df['g'] == 0].drop(columns=['g']).sort_values('year').reset_index(drop=True)
+    return share, trend
+
+@st.cache_data(ttl=300)
+def category_figures(start: str, end: str):
+    """(share pie, trend line, market-share area) as Plotly JSON, ``None`` when empty."""
+    rs, ct = category_breakdown(start, end)
+    pie = pio.to_json(px.pie(rs, values='revenue', names='category', title='Revenue Share')) if not rs.empty else None
+    if ct.empty:
+        return pie, None, None
+    ct['category'] = ct['category'].astype('category')
+    ct = ct.sort_values(['category', 'year'])
+    line = pio.to_json(px.line(ct, x="year", y="revenue", color="category"))
+    # Market share change by year (already normalized, so no groupnorm)
+    total = ct.groupby('year')['revenue'].transform('sum')
+    ct['share'] = ct['revenue']/total
+    area = pio.to_json(px.area(ct, x='year', y='share', color='category', title='Category Market Share Over Time'))
+    return pie, line, area
 
-rs = revenue_share(start_s, end_s)
-if not rs.empty:
+rs, _ = category_breakdown(start_s, end_s)
+pie_j, line_j, area_j = category_figures(start_s, end_s)
+if pie_j:
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(px.pie(rs, values='revenue', names='category', title='Revenue Share'), use_container_width=True)
+        st.plotly_chart(pio.from_json(pie_j), use_container_width=True)
     with col2:
         st.dataframe(rs.head(20))
 
-ct = category_trend(start_s, end_s)
-if not ct.empty:
+if line_j:
     st.subheader("Category Growth Trends")
-    fig = px.line(ct, x="year", y="revenue", color="category")
-    st.plotly_chart(fig, use_container_width=True)
-
-    # Market share change by year
-    total = ct.groupby('year')['revenue'].transform('sum')
-    ct['share'] = ct['revenue']/total
-    fig2 = px.area(ct, x='year', y='share', color='category', groupnorm='fraction', title='Category Market Share Over Time')
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(pio.from_json(line_j), use_container_width=True)
+    st.plotly_chart(pio.from_json(area_j), use_container_width=True)
 
 st.info("Profitability requires cost/margin data; add a costs table to compute category-wise margins.")
@@ -1,14 +1,10 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.charts import ranked_categorical
+from data_pipeline.bi.queries import revenue_by_city, revenue_by_state
 
 st.set_page_config(page_title="Geographic Revenue", layout="wide")
 st.title("Geographic Revenue Analysis")
@@ -18,26 +14,18 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
-@st.cache_data(ttl=300)
-def state_revenue(start: str, end: str):
-    sql = """
-      SELECT COALESCE(state,'Unknown') AS state, SUM(revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1 ORDER BY 2 DESC
-    """
-    return read_sql(sql, [start, end])
-
-@st.cache_data(ttl=300)
-def city_revenue(start: str, end: str):
-    sql = """
-      SELECT COALESCE(city,'Unknown') AS city, SUM(revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1 ORDER BY 2 DESC
-      LIMIT 50
-    """
-    return read_sql(sql, [start, end])
+def hbar(df: pd.DataFrame, label: str) -> go.Figure:
+    # go.Bar on plain arrays skips the plotly.express long-form pipeline; a
+    # ranked_categorical label fixes the axis to its category (rank) order
+    y = df[label]
+    yaxis = {}
+    if isinstance(y.dtype, pd.CategoricalDtype):
+        y = y.cat.remove_unused_categories()
+        yaxis = dict(categoryorder='array', categoryarray=list(y.cat.categories))
+    return go.Figure(
+        go.Bar(x=df['revenue'].to_numpy(), y=y, orientation='h'),
+        layout=dict(margin=dict(l=120, r=10, t=40, b=40), yaxis=yaxis),
+    )
 
 @st.cache_data(ttl=300)
 def tier_growth():
@@ -46,16 +34,18 @@ def tier_growth():
         'Bengaluru': 'Metro', 'Bangalore': 'Metro', 'Mumbai': 'Metro', 'Delhi': 'Metro', 'Hyderabad': 'Metro', 'Chennai': 'Metro', 'Kolkata': 'Metro', 'Pune': 'Tier1'
     }
 
-sr = state_revenue(start_s, end_s)
-cr = city_revenue(start_s, end_s)
+sr = revenue_by_state(start_s, end_s)
+sr = sr.assign(state=ranked_categorical(sr['state']))
+cr = revenue_by_city(start_s, end_s)
+cr = cr.assign(city=ranked_categorical(cr['city']))
 
 if not sr.empty:
     st.subheader("State-wise Revenue")
-    st.plotly_chart(px.bar(sr.head(25), x='revenue', y='state', orientation='h'), use_container_width=True)
+    st.plotly_chart(hbar(sr.head(25), 'state'), use_container_width=True)
 
 if not cr.empty:
     st.subheader("Top Cities by Revenue")
-    st.plotly_chart(px.bar(cr, x='revenue', y='city', orientation='h'), use_container_width=True)
+    st.plotly_chart(hbar(cr, 'city'), use_container_width=True)
 
 st.info("To enable interactive maps, provide an India states GeoJSON or use a mapping API; current view shows ranked bars.")
 
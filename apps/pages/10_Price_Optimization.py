@@ -1,15 +1,12 @@
-import os, sys, datetime as dt
-import numpy as np
+import datetime as dt
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.charts import RASTER_MIN_POINTS, density_heatmap
+from data_pipeline.bi.db import date_key_range, read_sql_arrow
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Price Optimization", layout="wide")
 st.title("Price Optimization")
@@ -23,70 +20,137 @@ bucket_count = st.sidebar.slider("Discount buckets", min_value=4, max_value=12,
 min_obs = st.sidebar.slider("Min points for elasticity", min_value=10, max_value=200, value=30)
 
 @st.cache_data(ttl=300)
-def categories():
-    try:
-        df = read_sql("""
-           SELECT DISTINCT category FROM products WHERE category IS NOT NULL
-           UNION
-           SELECT DISTINCT category FROM transactions WHERE category IS NOT NULL
-           ORDER BY 1
-        """)
-        return df["category"].dropna().tolist()
-    except Exception:
-        return []
-
-@st.cache_data(ttl=300)
-def brands_for_categories(cats: list[str] | None):
+def filter_universe(cats: list[str] | None) -> tuple[list[str], list[str]]:
+    """Category options and the brands within ``cats`` (all brands if None), in one round trip."""
     params = []
     cond = ""
     if cats:
-        cond = " WHERE category = ANY(%s)"
-        params.append(cats)
+        cond = " AND category = ANY(%s)"
+        params += [cats, cats]  # once per brand branch of the UNION
     # Prefer products, fallback to transactions union
-    df = read_sql(f"""
-        SELECT DISTINCT brand FROM products{cond}
+    df = read_sql_prepared("filter_universe", f"""
+        SELECT 'cat' AS kind, category AS val FROM products WHERE category IS NOT NULL
         UNION
-        SELECT DISTINCT brand FROM transactions{cond}
-        ORDER BY 1
-    """, params if params else None)
-    return df["brand"].dropna().tolist()
+        SELECT 'brand', brand FROM products WHERE brand IS NOT NULL{cond}
+        UNION
+        SELECT 'brand', brand FROM transactions WHERE brand IS NOT NULL{cond}
+        ORDER BY 1, 2
+    """, params)
+    is_cat = (df["kind"] == "cat").to_numpy(dtype=bool)
+    vals = df["val"].to_numpy(dtype=object)
+    return vals[is_cat].tolist(), vals[~is_cat].tolist()
+
+def _cat_brand_filters(cats: list[str] | None, brands: list[str] | None) -> str:
+    return ((' AND t.category_eff = ANY(%s)') if cats else '') + \
+           ((' AND t.brand_eff = ANY(%s)') if brands else '')
 
 @st.cache_data(ttl=300)
-def price_demand(start: str, end: str, cats: list[str] | None, brands: list[str] | None):
-    cond_cat = "" if not cats else " AND p.category = ANY(%s)"
-    cond_brand = "" if not brands else " AND p.brand = ANY(%s)"
-    params = [start, end]
-    if cats:
-        params.append(cats)
-    if brands:
-        params.append(brands)
+def elasticity(start: str, end: str, cats: list[str] | None, brands: list[str] | None):
+    """Log-log price elasticity per category (brand='All') and per category/brand.
+
+    The regression runs in Postgres, so only one row per group comes back;
+    ``n`` is the group's point count, for the page's ``min_obs`` check.
+    """
+    params = [*date_key_range(start, end)] + ([cats] if cats else []) + ([brands] if brands else [])
     sql = f"""
-      SELECT COALESCE(p.category, t.category, 'Unknown') AS category,
-             COALESCE(p.brand, t.brand, 'Unknown') AS brand,
-             t.unit_price, t.quantity
-      FROM transactions t
-      LEFT JOIN products p ON p.product_id = t.product_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s AND t.unit_price IS NOT NULL AND t.quantity IS NOT NULL
-        {(' AND COALESCE(p.category, t.category) = ANY(%s)') if cats else ''}
-        {(' AND COALESCE(p.brand, t.brand) = ANY(%s)') if brands else ''}
+      SELECT t.category_eff AS category,
+             CASE WHEN GROUPING(t.brand_eff) = 1 THEN 'All'
+                  ELSE t.brand_eff END AS brand,
+             regr_slope(ln(t.quantity + 1e-6), ln(t.unit_price + 1e-6)) AS elasticity,
+             regr_intercept(ln(t.quantity + 1e-6), ln(t.unit_price + 1e-6)) AS intercept,
+             regr_r2(ln(t.quantity + 1e-6), ln(t.unit_price + 1e-6)) AS r2,
+             COUNT(*) AS n
+      FROM transactions_enriched t
+      WHERE t.date_key BETWEEN %s AND %s AND t.unit_price IS NOT NULL AND t.quantity IS NOT NULL
+        {_cat_brand_filters(cats, brands)}
+      GROUP BY GROUPING SETS (
+        (t.category_eff),
+        (t.category_eff, t.brand_eff)
+      )
+      ORDER BY 1, 2
+    """
+    return read_sql_prepared("elasticity", sql, params)
+
+@st.cache_data(ttl=300)
+def price_points(start: str, end: str, category: str, brand: str | None, sample_pct: float):
+    """Price/quantity rows for one category (and brand) for the scatter plot.
+
+    ``sample_pct`` < 100 reads a ``TABLESAMPLE SYSTEM`` block sample instead of
+    the whole slice. Rows are streamed as Arrow and the frame keeps Arrow
+    dtypes, since a full-slice read can be millions of rows.
+    """
+    sample = f" TABLESAMPLE SYSTEM ({float(sample_pct)})" if sample_pct < 100 else ""
+    params = [*date_key_range(start, end), category] + ([brand] if brand else [])
+    sql = f"""
+      SELECT t.unit_price::float8 AS unit_price, t.quantity::float8 AS quantity
+      FROM transactions_enriched t{sample}
+      WHERE t.date_key BETWEEN %s AND %s AND t.unit_price IS NOT NULL AND t.quantity IS NOT NULL
+        AND t.category_eff = %s
+        {(" AND t.brand_eff = %s") if brand else ''}
+    """
+    return read_sql_arrow(sql, params).to_pandas(types_mapper=pd.ArrowDtype)
+
+@st.cache_data(ttl=300)
+def price_bands(start: str, end: str, category: str, brands: list[str] | None, min_obs: int):
+    """Units and revenue per price decile for one category.
+
+    Decile cut points come from ``percentile_cont`` and rows are assigned with
+    ``width_bucket``, so at most ten rows are returned. Empty when the slice has
+    fewer than ``min_obs`` rows.
     """
-    return read_sql(sql, params)
+    params = [*date_key_range(start, end), category] + ([brands] if brands else []) + [min_obs]
+    sql = f"""
+      WITH base AS (
+        SELECT t.unit_price::float8 AS unit_price, t.quantity::float8 AS quantity
+        FROM transactions_enriched t
+        WHERE t.date_key BETWEEN %s AND %s AND t.unit_price IS NOT NULL AND t.quantity IS NOT NULL
+          AND t.category_eff = %s
+          {(' AND t.brand_eff = ANY(%s)') if brands else ''}
+      ), q AS (
+        SELECT percentile_cont(ARRAY[0.1,0.2,0.3,0.4,0.5,0.6,0.7,0.8,0.9])
+                 WITHIN GROUP (ORDER BY unit_price) AS cuts
+        FROM base
+        HAVING COUNT(*) >= %s
+      )
+      SELECT width_bucket(b.unit_price, q.cuts) AS bkt,
+             MIN(b.unit_price) AS price_from,
+             SUM(b.quantity) AS units,
+             SUM(b.quantity * b.unit_price) AS revenue
+      FROM base b CROSS JOIN q
+      GROUP BY 1 ORDER BY 1
+    """
+    return read_sql_prepared("price_bands", sql, params)
+
+@st.cache_data(ttl=300)
+def brand_positioning(start: str, end: str, cats: list[str] | None, brands: list[str] | None):
+    """Median price, units and line revenue per (category, brand), one row each."""
+    params = [*date_key_range(start, end)] + ([cats] if cats else []) + ([brands] if brands else [])
+    sql = f"""
+      SELECT t.category_eff AS category,
+             t.brand_eff AS brand,
+             percentile_cont(0.5) WITHIN GROUP (ORDER BY t.unit_price) AS median_price,
+             SUM(t.quantity) AS units,
+             SUM(t.quantity * t.unit_price) AS revenue
+      FROM transactions_enriched t
+      WHERE t.date_key BETWEEN %s AND %s AND t.unit_price IS NOT NULL AND t.quantity IS NOT NULL
+        {_cat_brand_filters(cats, brands)}
+      GROUP BY 1, 2
+    """
+    return read_sql_prepared("brand_positioning", sql, params)
 
 @st.cache_data(ttl=300)
 def discount_effect(start: str, end: str, cats: list[str] | None, max_pct: int, buckets: int):
-    cond_cat = "" if not cats else " AND p.category = ANY(%s)"
+    cond_cat = "" if not cats else " AND t.category_eff = ANY(%s)"
     params = [start, end]
     if cats:
         params.append(cats)
     sql = f"""
-      SELECT COALESCE(p.category, t.category, 'Unknown') AS category,
+      SELECT t.category_eff AS category,
              width_bucket(COALESCE(t.discount_pct,0), 0, %s, %s) AS disc_bucket,
-             AVG(t.discount_pct) AS avg_disc,
-             SUM(t.quantity) AS units,
-             SUM(t.revenue) AS revenue
-      FROM transactions t
-      LEFT JOIN products p ON p.product_id = t.product_id
+             AVG(t.discount_pct)::float4 AS avg_disc,
+             SUM(t.quantity)::int4 AS units,
+             SUM(t.revenue)::float8 AS revenue
+      FROM transactions_enriched t
       JOIN time_dimension d ON d.date_key = t.date_key
       WHERE d.date BETWEEN %s AND %s {cond_cat}
       GROUP BY 1,2
@@ -95,42 +159,48 @@ def discount_effect(start: str, end: str, cats: list[str] | None, max_pct: int,
     if max_pct <= 0 or buckets <= 0:
         return pd.DataFrame(columns=["category","disc_bucket","avg_disc","units","revenue"])
     # prepend bucket params in order: max, buckets
-    return read_sql(sql, [max_pct, buckets] + params)
+    return read_sql_prepared("discount_effect", sql, [max_pct, buckets] + params)
 
-cat_opts = ["All"] + categories()
+all_cats, all_brands = filter_universe(None)
+cat_opts = ["All"] + all_cats
 cat_sel = st.sidebar.multiselect("Categories", cat_opts, default=["All"]) 
 cats = None if ("All" in cat_sel or not cat_sel) else cat_sel
-brand_opts = ["All"] + brands_for_categories(cats)
+brand_opts = ["All"] + (filter_universe(cats)[1] if cats else all_brands)
 brand_sel = st.sidebar.multiselect("Brands", brand_opts, default=["All"]) 
 brands = None if ("All" in brand_sel or not brand_sel) else brand_sel
 
-pd_df = price_demand(start_s, end_s, cats, brands)
-if not pd_df.empty:
+el = elasticity(start_s, end_s, cats, brands)
+# every selectable category, whatever min_obs is; the threshold only gates the fit
+cat_list = sorted(cats) if cats else all_cats
+if cat_list:
     st.subheader("Price vs Demand (Units)")
-    cat_list = sorted(pd_df['category'].unique())
     cat_choice = st.selectbox("Category", cat_list)
-    sub = pd_df[pd_df['category'] == cat_choice]
+    el_cat = el[el['category'] == cat_choice]
     # optional brand filter within chart
-    brand_in_cat = ["All"] + sorted(sub['brand'].dropna().unique().tolist())
+    brand_in_cat = ["All"] + sorted(b for b in el_cat['brand'].dropna().unique().tolist() if b != "All")
     brand_choice = st.selectbox("Brand (optional)", brand_in_cat)
-    if brand_choice != "All":
-        sub = sub[sub['brand'] == brand_choice]
-    # scatter with trendline if statsmodels available
-    try:
-        fig_scatter = px.scatter(sub, x='unit_price', y='quantity', trendline='ols', title=f'Price vs Units - {cat_choice}')
-    except Exception:
-        fig_scatter = px.scatter(sub, x='unit_price', y='quantity', title=f'Price vs Units - {cat_choice}')
+    brand_arg = None if brand_choice == "All" else brand_choice
+    # scatter from a 5% block sample; small slices are read in full
+    sub = price_points(start_s, end_s, cat_choice, brand_arg, 5.0)
+    if len(sub) < min_obs:
+        sub = price_points(start_s, end_s, cat_choice, brand_arg, 100.0)
+    # elasticity via log-log slope + R^2, fitted in SQL on the full slice
+    row = el_cat[(el_cat['brand'] == brand_choice) & (el_cat['n'] >= min_obs)]
+    if len(sub) > RASTER_MIN_POINTS:
+        fig_scatter = density_heatmap(sub['unit_price'], sub['quantity'], title=f'Price vs Units - {cat_choice}')
+    else:
+        fig_scatter = px.scatter(sub, x='unit_price', y='quantity', render_mode='webgl', title=f'Price vs Units - {cat_choice}')
+    if not row.empty and not sub.empty:
+        # overlay the SQL fit (quantity = exp(b0) * price**b1) instead of a Plotly/statsmodels trendline
+        b0, b1 = float(row['intercept'].iloc[0]), float(row['elasticity'].iloc[0])
+        x_line = np.geomspace(max(float(sub['unit_price'].min()), 1e-6), float(sub['unit_price'].max()), 50)
+        fig_scatter.add_scatter(x=x_line, y=np.exp(b0) * x_line**b1, mode='lines', name='OLS (log-log)')
     st.plotly_chart(fig_scatter, use_container_width=True)
-    # elasticity via log-log slope + R^2
-    if len(sub) >= min_obs:
-        x = np.log(sub['unit_price'].astype(float) + 1e-6)
-        y = np.log(sub['quantity'].astype(float) + 1e-6)
-        b1, b0 = np.polyfit(x, y, 1)
-        y_pred = b1*x + b0
-        ss_res = np.sum((y - y_pred)**2)
-        ss_tot = np.sum((y - np.mean(y))**2)
-        r2 = 1 - ss_res/ss_tot if ss_tot != 0 else np.nan
+    if not row.empty:
+        b1, r2 = row['elasticity'].iloc[0], row['r2'].iloc[0]
         st.info(f"Estimated elasticity (log-log slope) for {cat_choice}{' - ' + brand_choice if brand_choice!='All' else ''}: {b1:.2f} (R²={r2:.2f})")
+    else:
+        st.info(f"Fewer than {min_obs} price points for this selection; no elasticity fit.")
 else:
     st.warning("Insufficient price/quantity data for elasticity analysis.")
 
@@ -143,28 +213,25 @@ if not de.empty:
     st.plotly_chart(px.line(de, x='disc_label', y='revenue', color='category', markers=True, title='Revenue vs Discount %'), use_container_width=True)
 
     # Heatmap of revenue by category vs discount bucket
-    piv = de.pivot_table(index='category', columns='disc_label', values='revenue', aggfunc='sum', fill_value=0)
-    st.dataframe(piv)
+    piv = de.groupby(['category', 'disc_label'])['revenue'].sum().unstack(fill_value=0)
+    st.dataframe(piv.round(1), use_container_width=True, height=400)
 
 st.subheader("Price Bands Analysis")
-if not pd_df.empty:
-    cat_choice2 = st.selectbox("Category for bands", sorted(pd_df['category'].unique()), key='bands_cat')
-    sub2 = pd_df[pd_df['category'] == cat_choice2].copy()
-    if len(sub2) >= min_obs:
-        sub2['band'] = pd.qcut(sub2['unit_price'], q=10, duplicates='drop')
-        sub2['line_rev'] = sub2['unit_price'].astype(float) * sub2['quantity'].astype(float)
-        agg = sub2.groupby('band').agg(units=('quantity','sum'), revenue=('line_rev','sum'))
+if cat_list:
+    cat_choice2 = st.selectbox("Category for bands", cat_list, key='bands_cat')
+    agg = price_bands(start_s, end_s, cat_choice2, brands, min_obs)
+    if not agg.empty:
+        agg = agg.set_index('price_from')
         st.bar_chart(agg['units'])
         st.bar_chart(agg['revenue'])
 
 st.subheader("Brand Positioning (within category)")
-if not pd_df.empty:
-    cat_choice3 = st.selectbox("Category for brand positioning", sorted(pd_df['category'].unique()), key='brand_pos_cat')
-    sub3 = pd_df[pd_df['category'] == cat_choice3].copy()
-    if not sub3.empty:
-        brand_stats = sub3.groupby('brand').agg(median_price=('unit_price','median'), units=('quantity','sum')).reset_index()
-        brand_stats['revenue'] = brand_stats['units'] * brand_stats['median_price']
-        fig_bp = px.scatter(brand_stats, x='median_price', y='units', size='revenue', hover_name='brand', title=f'Brand Positioning - {cat_choice3}')
+if cat_list:
+    cat_choice3 = st.selectbox("Category for brand positioning", cat_list, key='brand_pos_cat')
+    bp = brand_positioning(start_s, end_s, cats, brands)
+    brand_stats = bp[bp['category'] == cat_choice3]
+    if not brand_stats.empty:
+        fig_bp = px.scatter(brand_stats, x='median_price', y='units', size='revenue', hover_name='brand', render_mode='webgl', title=f'Brand Positioning - {cat_choice3}')
         st.plotly_chart(fig_bp, use_container_width=True)
 
 st.info("Competitive pricing analysis can be added using brand/competitor mappings and external price feeds.")
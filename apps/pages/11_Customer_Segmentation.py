@@ -1,15 +1,11 @@
-import os, sys, datetime as dt
-import numpy as np
+import datetime as dt
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.cache import cached_query
+from data_pipeline.bi.charts import RASTER_MIN_POINTS, density_heatmap
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Customer Segmentation (RFM)", layout="wide")
 st.title("Customer Segmentation (RFM & Behavior)")
@@ -19,38 +15,51 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+RFM_TABLE_SQL = """
+WITH orders AS (
+  SELECT t.customer_id, d.date::date AS order_date, t.revenue
+  FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
+  WHERE d.date BETWEEN %s AND %s AND t.customer_id IS NOT NULL
+),
+last_ref AS (SELECT MAX(order_date) AS ref FROM orders),
+rfm AS (
+  SELECT o.customer_id,
+         (SELECT ref FROM last_ref) AS ref_date,
+         MAX(o.order_date) AS last_order,
+         COUNT(*) AS frequency,
+         SUM(o.revenue) AS monetary
+  FROM orders o
+  GROUP BY o.customer_id
+)
+SELECT customer_id, ref_date, last_order,
+       ref_date - last_order AS "R",
+       frequency AS "F",
+       monetary AS "M",
+       -- quintile scores; the most recent buyers get R_score 5
+       NTILE(5) OVER (ORDER BY last_order, customer_id)::int2 AS "R_score",
+       NTILE(5) OVER (ORDER BY frequency, customer_id)::int2 AS "F_score",
+       NTILE(5) OVER (ORDER BY monetary, customer_id)::int2 AS "M_score"
+FROM rfm
+"""
+
 @st.cache_data(ttl=300)
+@cached_query("rfm_table", sql=RFM_TABLE_SQL)
 def rfm_table(start: str, end: str) -> pd.DataFrame:
-    sql = """
-      WITH orders AS (
-        SELECT t.customer_id, d.date::date AS order_date, t.revenue
-        FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-        WHERE d.date BETWEEN %s AND %s AND t.customer_id IS NOT NULL
-      ),
-      last_ref AS (SELECT MAX(order_date) AS ref FROM orders)
-      SELECT o.customer_id,
-             (SELECT ref FROM last_ref) AS ref_date,
-             MAX(o.order_date) AS last_order,
-             COUNT(*) AS frequency,
-             SUM(o.revenue) AS monetary
-      FROM orders o
-      GROUP BY o.customer_id
-    """
-    df = read_sql(sql, [start, end])
+    df = read_sql_prepared("rfm_table", RFM_TABLE_SQL, [start, end])
     if df.empty:
         return df
-    df["R"] = (pd.to_datetime(df["ref_date"]) - pd.to_datetime(df["last_order"]) ).dt.days
-    df = df.rename(columns={"frequency":"F", "monetary":"M"})
-    # Percentile ranks for scores
-    def qs(s, buckets=5, reverse=False):
-        ranks = s.rank(pct=True, method='first')
-        if reverse: ranks = 1 - ranks
-        return np.ceil(ranks*buckets).astype(int).clip(1,buckets)
-    df["R_score"] = qs(df["R"], reverse=True)
-    df["F_score"] = qs(df["F"]) 
-    df["M_score"] = qs(df["M"]) 
-    df["Segment"] = df["R_score"].astype(str) + df["F_score"].astype(str) + df["M_score"].astype(str)
-    return df
+    return df.assign(Segment=(df["R_score"]*100 + df["F_score"]*10 + df["M_score"]).astype(str))
+
+DRILLDOWN_PAGE_SIZE = 200
+
+def segment_rows(rfm: pd.DataFrame, segment: str, page: int) -> pd.DataFrame:
+    """One page of a segment's customers, highest monetary first.
+
+    Sliced from the already scored ``rfm`` frame, so page contents always agree
+    with the segment counts and no query runs per page.
+    """
+    rows = rfm[rfm["Segment"] == segment].sort_values(["M", "customer_id"], ascending=[False, True])
+    return rows.iloc[page * DRILLDOWN_PAGE_SIZE:(page + 1) * DRILLDOWN_PAGE_SIZE]
 
 rfm = rfm_table(start_s, end_s)
 if rfm.empty:
@@ -67,10 +76,17 @@ st.subheader("Top RFM Segments")
 st.dataframe(seg_counts.head(20))
 
 st.subheader("RFM Scatter (F vs M, colored by Recency days)")
-fig = px.scatter(rfm, x='F', y='M', color='R', color_continuous_scale='viridis', hover_data=['Segment','customer_id'])
+if len(rfm) > RASTER_MIN_POINTS:
+    # too many customers to draw individually: show point density instead
+    fig = density_heatmap(rfm['F'], rfm['M'])
+else:
+    fig = px.scatter(rfm, x='F', y='M', color='R', color_continuous_scale='viridis', hover_data=['Segment','customer_id'], render_mode='webgl')
 st.plotly_chart(fig, use_container_width=True)
 
 st.subheader("Segment Drill-down")
 seg_choice = st.selectbox("Select segment", seg_counts['Segment'].tolist())
-st.dataframe(rfm[rfm['Segment']==seg_choice].sort_values('M', ascending=False).head(200))
+seg_size = int(seg_counts.loc[seg_counts['Segment'] == seg_choice, 'count'].iloc[0])
+n_pages = max(1, -(-seg_size // DRILLDOWN_PAGE_SIZE))
+page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1) - 1
+st.dataframe(segment_rows(rfm, seg_choice, int(page)), use_container_width=True, height=400)
 
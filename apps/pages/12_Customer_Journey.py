@@ -1,14 +1,11 @@
-import os, sys, datetime as dt
+import datetime as dt
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.cache import cached_query
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Customer Journey", layout="wide")
 st.title("Customer Journey Analytics")
@@ -18,27 +15,26 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+TRANSITIONS_SQL = """
+WITH base AS (
+  SELECT t.customer_id,
+         t.category_eff AS cat_to,
+         LAG(t.category_eff)
+           OVER (PARTITION BY t.customer_id ORDER BY d.date, t.tx_id) AS cat_from
+  FROM transactions_enriched t
+  JOIN time_dimension d ON d.date_key = t.date_key
+  WHERE d.date BETWEEN %s AND %s AND t.customer_id IS NOT NULL
+)
+SELECT cat_from, cat_to, COUNT(*) AS transitions
+FROM base
+WHERE cat_from IS NOT NULL  -- each customer's first order has no predecessor
+GROUP BY cat_from, cat_to ORDER BY transitions DESC
+"""
+
 @st.cache_data(ttl=300)
+@cached_query("transitions", sql=TRANSITIONS_SQL)
 def transitions(start: str, end: str) -> pd.DataFrame:
-    sql = """
-      WITH base AS (
-        SELECT t.customer_id,
-               d.date AS order_date,
-               COALESCE(p.category, t.category, 'Unknown') AS category,
-               ROW_NUMBER() OVER (PARTITION BY t.customer_id ORDER BY d.date, t.tx_id) AS rn
-        FROM transactions t
-        JOIN time_dimension d ON d.date_key = t.date_key
-        LEFT JOIN products p ON p.product_id = t.product_id
-        WHERE d.date BETWEEN %s AND %s AND t.customer_id IS NOT NULL
-      ), pairs AS (
-        SELECT b1.customer_id, b1.category AS cat_from, b2.category AS cat_to
-        FROM base b1
-        JOIN base b2 ON b1.customer_id=b2.customer_id AND b2.rn=b1.rn+1
-      )
-      SELECT cat_from, cat_to, COUNT(*) AS transitions
-      FROM pairs GROUP BY cat_from, cat_to ORDER BY transitions DESC
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("transitions", TRANSITIONS_SQL, [start, end])
 
 trans = transitions(start_s, end_s)
 if trans.empty:
@@ -46,7 +42,14 @@ if trans.empty:
     st.stop()
 
 st.subheader("Category-to-Category Transitions")
-fig = px.imshow(trans.pivot_table(index='cat_from', columns='cat_to', values='transitions', aggfunc='sum', fill_value=0),
+# dense from/to matrix via a scatter-add on category codes, no pivot
+cat_from = trans['cat_from'].to_numpy(dtype=object)
+cat_to = trans['cat_to'].to_numpy(dtype=object)
+cat_idx = pd.Index(sorted(set(cat_from) | set(cat_to)))
+M = np.zeros((len(cat_idx), len(cat_idx)), dtype=np.int64)
+np.add.at(M, (cat_idx.get_indexer(cat_from), cat_idx.get_indexer(cat_to)), trans['transitions'].to_numpy(dtype=np.int64))
+fig = px.imshow(M, x=cat_idx.tolist(), y=cat_idx.tolist(),
+                labels=dict(x='cat_to', y='cat_from', color='transitions'),
                 color_continuous_scale='Blues', aspect='auto')
 st.plotly_chart(fig, use_container_width=True)
 
@@ -1,14 +1,13 @@
-import os, sys, datetime as dt
+import datetime as dt
 import pandas as pd
 import streamlit as st
 import plotly.express as px
+import plotly.io as pio
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.cache import cached_query
+from data_pipeline.bi.charts import stacked_share_bars
+from data_pipeline.bi.db import count_distinct_sql
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Prime Membership Analytics", layout="wide")
 st.title("Prime Membership Analytics")
@@ -18,53 +17,66 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+# customers is an HLL estimate when BI_USE_HLL is set
+PRIME_METRICS_SQL = f"""
+SELECT COALESCE(t.is_prime_member, c.is_prime_member) AS prime,
+       COUNT(*) AS orders,
+       {count_distinct_sql('t.customer_id')} AS customers,
+       SUM(t.revenue) AS revenue,
+       AVG(t.revenue) AS aov
+FROM transactions t
+LEFT JOIN customers c ON c.customer_id = t.customer_id
+JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1
+"""
+
 @st.cache_data(ttl=300)
 def prime_metrics(start: str, end: str):
-    sql = """
-      SELECT COALESCE(t.is_prime_member, c.is_prime_member) AS prime,
-             COUNT(*) AS orders,
-             COUNT(DISTINCT t.customer_id) AS customers,
-             SUM(t.revenue) AS revenue,
-             AVG(t.revenue) AS aov
-      FROM transactions t
-      LEFT JOIN customers c ON c.customer_id = t.customer_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("prime_metrics", PRIME_METRICS_SQL, [start, end])
 
 pm = prime_metrics(start_s, end_s)
 if pm.empty:
     st.warning("No data available.")
     st.stop()
 
+is_prime = pm['prime'].eq(True).fillna(False)
+is_non_prime = pm['prime'].eq(False).fillna(False)
 col1, col2, col3 = st.columns(3)
-col1.metric("Prime Orders", f"{int(pm[pm['prime']==True]['orders'].sum()):,}")
-col2.metric("Non-Prime Orders", f"{int(pm[pm['prime']==False]['orders'].sum()):,}")
-col3.metric("Prime Revenue Share", f"{(pm[pm['prime']==True]['revenue'].sum() / max(1, pm['revenue'].sum()) * 100):.1f}%")
+col1.metric("Prime Orders", f"{int(pm[is_prime]['orders'].sum()):,}")
+col2.metric("Non-Prime Orders", f"{int(pm[is_non_prime]['orders'].sum()):,}")
+col3.metric("Prime Revenue Share", f"{(pm[is_prime]['revenue'].sum() / max(1, pm['revenue'].sum()) * 100):.1f}%")
 
 st.subheader("AOV by Prime Segment")
-st.plotly_chart(px.bar(pm.fillna({'prime':'Unknown'}), x='prime', y='aov'), use_container_width=True)
+st.plotly_chart(px.bar(pm.assign(prime=pm['prime'].astype(object).fillna('Unknown')), x='prime', y='aov'), use_container_width=True)
+
+PRIME_CATEGORY_MIX_SQL = """
+SELECT COALESCE(t.is_prime_member, c.is_prime_member) AS prime,
+       t.category_eff AS category,
+       SUM(t.revenue) AS revenue
+FROM transactions_enriched t
+LEFT JOIN customers c ON c.customer_id = t.customer_id
+JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1,2
+"""
 
 @st.cache_data(ttl=300)
+@cached_query("prime_category_mix", sql=PRIME_CATEGORY_MIX_SQL)
 def prime_category_mix(start: str, end: str):
-    sql = """
-      SELECT COALESCE(t.is_prime_member, c.is_prime_member) AS prime,
-             COALESCE(p.category, t.category, 'Unknown') AS category,
-             SUM(t.revenue) AS revenue
-      FROM transactions t
-      LEFT JOIN products p ON p.product_id = t.product_id
-      LEFT JOIN customers c ON c.customer_id = t.customer_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1,2
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("prime_category_mix", PRIME_CATEGORY_MIX_SQL, [start, end])
+
+@st.cache_data(ttl=300)
+def prime_category_mix_fig_json(start: str, end: str) -> str | None:
+    """Category mix as pre-normalized stacked bars (Plotly JSON), one trace per segment."""
+    mix = prime_category_mix(start, end)
+    if mix.empty:
+        return None
+    mix = mix.assign(prime=mix['prime'].astype(object).fillna('Unknown').astype(str))
+    return stacked_share_bars(mix, 'category', 'prime', 'revenue').to_json()
 
-mix = prime_category_mix(start_s, end_s)
-if not mix.empty:
+mix_json = prime_category_mix_fig_json(start_s, end_s)
+if mix_json:
     st.subheader("Category Mix by Prime Segment")
-    fig = px.area(mix, x='category', y='revenue', color='prime', groupnorm='fraction')
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(pio.from_json(mix_json), use_container_width=True)
 
@@ -1,14 +1,10 @@
-import os, sys, datetime as dt
+import datetime as dt
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.charts import stacked_share_bars
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Demographics & Behavior", layout="wide")
 st.title("Demographics & Behavioral Analytics")
@@ -18,32 +14,33 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+AGE_GROUP_REVENUE_SQL = """
+SELECT COALESCE(c.age_group, 'Unknown') AS age_group, SUM(t.revenue)::float8 AS revenue
+FROM transactions t
+LEFT JOIN customers c ON c.customer_id = t.customer_id
+JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1 ORDER BY 2 DESC
+"""
+
 @st.cache_data(ttl=300)
 def age_group_revenue(start: str, end: str):
-    sql = """
-      SELECT COALESCE(c.age_group, 'Unknown') AS age_group, SUM(t.revenue) AS revenue
-      FROM transactions t
-      LEFT JOIN customers c ON c.customer_id = t.customer_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1 ORDER BY 2 DESC
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("age_group_revenue", AGE_GROUP_REVENUE_SQL, [start, end])
+
+AGE_CATEGORY_PREF_SQL = """
+SELECT COALESCE(c.age_group,'Unknown') AS age_group,
+       t.category_eff AS category,
+       SUM(t.revenue) AS revenue
+FROM transactions_enriched t
+LEFT JOIN customers c ON c.customer_id=t.customer_id
+JOIN time_dimension d ON d.date_key=t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1,2
+"""
 
 @st.cache_data(ttl=300)
 def age_category_pref(start: str, end: str):
-    sql = """
-      SELECT COALESCE(c.age_group,'Unknown') AS age_group,
-             COALESCE(p.category, t.category, 'Unknown') AS category,
-             SUM(t.revenue) AS revenue
-      FROM transactions t
-      LEFT JOIN customers c ON c.customer_id=t.customer_id
-      LEFT JOIN products p ON p.product_id=t.product_id
-      JOIN time_dimension d ON d.date_key=t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1,2
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("age_category_pref", AGE_CATEGORY_PREF_SQL, [start, end])
 
 ar = age_group_revenue(start_s, end_s)
 if not ar.empty:
@@ -53,7 +50,7 @@ if not ar.empty:
 ac = age_category_pref(start_s, end_s)
 if not ac.empty:
     st.subheader("Category Preference by Age Group")
-    fig = px.area(ac, x='category', y='revenue', color='age_group', groupnorm='fraction')
+    fig = stacked_share_bars(ac, 'category', 'age_group', 'revenue')
     st.plotly_chart(fig, use_container_width=True)
 
 st.info("Populate customers.age_group to unlock full demographic insights. If you have gender or income segments, we can add them similarly.")
@@ -1,14 +1,11 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Brand Analytics", layout="wide")
 st.title("Brand Analytics Dashboard")
@@ -18,33 +15,48 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+BRAND_SHARE_SQL = """
+SELECT t.brand_eff AS brand, SUM(t.revenue)::float8 AS revenue
+FROM transactions_enriched t
+JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1 ORDER BY 2 DESC
+"""
+
 @st.cache_data(ttl=300)
 def brand_share(start: str, end: str):
-    sql = """
-      SELECT COALESCE(p.brand, t.brand, 'Unknown') AS brand, SUM(t.revenue) AS revenue
-      FROM transactions t LEFT JOIN products p ON p.product_id = t.product_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY 1 ORDER BY 2 DESC
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("brand_share", BRAND_SHARE_SQL, [start, end])
+
+BRAND_TREND_SQL = """
+SELECT d.year, t.brand_eff AS brand, SUM(t.revenue) AS revenue
+FROM transactions_enriched t
+JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY 1, 2 ORDER BY 1
+"""
 
 @st.cache_data(ttl=300)
 def brand_trend(start: str, end: str):
-    sql = """
-      SELECT d.year, COALESCE(p.brand, t.brand, 'Unknown') AS brand, SUM(t.revenue) AS revenue
-      FROM transactions t LEFT JOIN products p ON p.product_id = t.product_id
-      JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY d.year, brand ORDER BY d.year
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("brand_trend", BRAND_TREND_SQL, [start, end])
+
+@st.cache_data(ttl=300)
+def brand_trend_fig_json(start: str, end: str) -> str | None:
+    """Brand trend lines as Plotly JSON, one trace per brand with ``uid`` = brand."""
+    bt = brand_trend(start, end)
+    if bt.empty:
+        return None
+    fig = go.Figure(
+        [go.Scatter(x=g['year'].to_numpy(), y=g['revenue'].to_numpy(), mode='lines', name=str(brand), uid=str(brand))
+         for brand, g in bt.groupby('brand', sort=True)],
+        layout=dict(title='Brand Revenue Trend', xaxis_title='year', yaxis_title='revenue'),
+    )
+    return fig.to_json()
 
 bs = brand_share(start_s, end_s)
 if not bs.empty:
     st.plotly_chart(px.pie(bs.head(15), values='revenue', names='brand', title='Top Brand Share'), use_container_width=True)
 
-bt = brand_trend(start_s, end_s)
-if not bt.empty:
-    st.plotly_chart(px.line(bt, x='year', y='revenue', color='brand', title='Brand Revenue Trend'), use_container_width=True)
+bt_json = brand_trend_fig_json(start_s, end_s)
+if bt_json:
+    st.plotly_chart(pio.from_json(bt_json), use_container_width=True)
 
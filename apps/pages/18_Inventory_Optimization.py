@@ -1,14 +1,9 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Inventory Optimization", layout="wide")
 st.title("Inventory Optimization Dashboard")
@@ -18,15 +13,16 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+DEMAND_MONTHLY_SQL = """
+SELECT d.year, d.month, SUM(t.quantity)::int4 AS units
+FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
+WHERE d.date BETWEEN %s AND %s
+GROUP BY d.year, d.month ORDER BY d.year, d.month
+"""
+
 @st.cache_data(ttl=300)
 def demand_monthly(start: str, end: str):
-    sql = """
-      SELECT d.year, d.month, SUM(t.quantity) AS units
-      FROM transactions t JOIN time_dimension d ON d.date_key = t.date_key
-      WHERE d.date BETWEEN %s AND %s
-      GROUP BY d.year, d.month ORDER BY d.year, d.month
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("demand_monthly", DEMAND_MONTHLY_SQL, [start, end])
 
 dm = demand_monthly(start_s, end_s)
 if not dm.empty:
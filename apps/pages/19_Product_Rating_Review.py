@@ -1,14 +1,9 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.queries import read_sql_prepared
 
 st.set_page_config(page_title="Product Rating & Reviews", layout="wide")
 st.title("Product Rating & Review Dashboard")
@@ -18,18 +13,19 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+RATING_DISTRIBUTION_SQL = """
+SELECT t.category_eff AS category,
+       AVG(t.customer_rating)::float4 AS avg_rating,
+       COUNT(*)::int4 AS cnt
+FROM transactions_enriched t
+JOIN time_dimension d ON d.date_key=t.date_key
+WHERE d.date BETWEEN %s AND %s AND t.customer_rating IS NOT NULL
+GROUP BY 1 ORDER BY 2 DESC
+"""
+
 @st.cache_data(ttl=300)
 def rating_distribution(start: str, end: str):
-    sql = """
-      SELECT COALESCE(p.category, t.category, 'Unknown') AS category,
-             AVG(t.customer_rating) AS avg_rating,
-             COUNT(*) AS cnt
-      FROM transactions t LEFT JOIN products p ON p.product_id=t.product_id
-      JOIN time_dimension d ON d.date_key=t.date_key
-      WHERE d.date BETWEEN %s AND %s AND t.customer_rating IS NOT NULL
-      GROUP BY 1 ORDER BY 2 DESC
-    """
-    return read_sql(sql, [start, end])
+    return read_sql_prepared("rating_distribution", RATING_DISTRIBUTION_SQL, [start, end])
 
 rd = rating_distribution(start_s, end_s)
 if not rd.empty:
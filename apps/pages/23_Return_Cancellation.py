@@ -1,14 +1,9 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, read_sql
 
 st.set_page_config(page_title="Returns & Cancellations", layout="wide")
 st.title("Return & Cancellation Dashboard")
@@ -26,11 +21,10 @@ def return_rates(start: str, end: str):
              SUM(t.revenue) AS revenue,
              SUM(t.quantity) AS units
       FROM transactions t LEFT JOIN products p ON p.product_id=t.product_id
-      JOIN time_dimension d ON d.date_key=t.date_key
-      WHERE d.date BETWEEN %s AND %s
+      WHERE t.date_key BETWEEN %s AND %s
       GROUP BY 1 ORDER BY 2 DESC
     """
-    return read_sql(sql, [start, end])
+    return read_sql(sql, list(date_key_range(start, end)))
 
 rr = return_rates(start_s, end_s)
 if not rr.empty:
@@ -1,16 +1,11 @@
-import os, sys, datetime as dt
+import datetime as dt
 import numpy as np
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 from statsmodels.tsa.api import ExponentialSmoothing
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, read_sql
 
 st.set_page_config(page_title="Predictive Analytics", layout="wide")
 st.title("Predictive Analytics")
@@ -23,27 +18,40 @@ horizon = st.sidebar.slider("Forecast horizon (months)", 3, 24, 12)
 
 @st.cache_data(ttl=300)
 def monthly_revenue(start: str, end: str):
+    # mv_revenue_monthly is monthly, so the range is applied at month granularity
     sql = """
-      SELECT make_date(d.year, d.month, 1) AS ym, SUM(t.revenue) AS revenue
-      FROM transactions t JOIN time_dimension d ON d.date_key=t.date_key
-      WHERE d.date BETWEEN %s AND %s
+      SELECT make_date(year, month, 1) AS ym, SUM(revenue) AS revenue
+      FROM mv_revenue_monthly
+      WHERE year * 100 + month BETWEEN %s AND %s
       GROUP BY ym ORDER BY ym
     """
-    return read_sql(sql, [start, end])
+    return read_sql(sql, [k // 100 for k in date_key_range(start, end)])
 
 mr = monthly_revenue(start_s, end_s)
 if mr.empty:
     st.warning("Not enough data to forecast.")
     st.stop()
 
-ts = mr.set_index('ym')['revenue']
-model = ExponentialSmoothing(ts, trend='add', seasonal='add', seasonal_periods=12)
-fit = model.fit(optimized=True)
-fcast = fit.forecast(horizon)
-fc = fcast.reset_index().rename(columns={'index':'ym', 0:'forecast'})
-mr['type'] = 'actual'; fc['type'] = 'forecast'; fc = fc.rename(columns={'forecast':'revenue'})
-allp = pd.concat([mr[['ym','revenue','type']], fc[['ym','revenue','type']]])
-st.plotly_chart(px.line(allp, x='ym', y='revenue', color='type', title='Monthly Revenue Forecast'), use_container_width=True)
+@st.cache_resource(max_entries=32)
+def fit_hw(ts_bytes: bytes, season: int = 12):
+    """Additive Holt-Winters fit of a float64 series, kept per distinct series.
+
+    Independent of the horizon, so moving the horizon slider reuses the fit
+    and only ``forecast`` runs.
+    """
+    ts = np.frombuffer(ts_bytes, dtype=np.float64)
+    return ExponentialSmoothing(ts, trend='add', seasonal='add', seasonal_periods=season).fit(optimized=True)
+
+ts = mr['revenue'].to_numpy(dtype=np.float64)
+fit = fit_hw(ts.tobytes(), 12)
+ym = pd.date_range(pd.Timestamp(mr['ym'].iloc[-1]), periods=horizon + 1, freq='MS')[1:]
+# one trace per series straight from NumPy arrays; no combined long frame
+fig = go.Figure([
+    go.Scatter(x=mr['ym'].to_numpy(dtype='datetime64[ns]'), y=ts, mode='lines', name='actual'),
+    go.Scatter(x=ym.to_numpy(), y=np.asarray(fit.forecast(horizon), dtype=np.float64), mode='lines', name='forecast'),
+])
+fig.update_layout(title='Monthly Revenue Forecast', xaxis_title='ym', yaxis_title='revenue', legend_title_text='type')
+st.plotly_chart(fig, use_container_width=True)
 
 st.info("For churn prediction and scenario planning, share labeled churn data or specify drivers; we can add a classifier and slider-driven scenarios.")
 
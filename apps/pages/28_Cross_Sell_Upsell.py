@@ -1,13 +1,8 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import date_key_range, fetch_frame, get_conn
 
 st.set_page_config(page_title="Cross-sell & Upsell", layout="wide")
 st.title("Cross-selling & Upselling")
@@ -17,22 +12,36 @@ start_date = st.sidebar.date_input("Start date", value=today.replace(year=max(20
 end_date = st.sidebar.date_input("End date", value=today)
 start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
+ASSOCIATIONS_SQL = """
+WITH baskets AS (
+  SELECT order_id, array_agg(DISTINCT product_id ORDER BY product_id) AS ps
+  FROM transactions
+  WHERE date_key BETWEEN %s AND %s AND order_id IS NOT NULL AND product_id IS NOT NULL
+  GROUP BY order_id
+  HAVING COUNT(DISTINCT product_id) > 1  -- single-item baskets have no pairs
+),
+pairs AS (
+  -- ps is sorted, so i < j yields each unordered pair once
+  SELECT ps[i] AS prod_a, ps[j] AS prod_b
+  FROM baskets,
+       generate_subscripts(ps, 1) AS i,
+       generate_subscripts(ps, 1) AS j
+  WHERE i < j
+)
+SELECT prod_a, prod_b, COUNT(*) AS co_occurs
+FROM pairs
+GROUP BY prod_a, prod_b
+ORDER BY co_occurs DESC
+LIMIT 100
+"""
+
 @st.cache_data(ttl=300)
 def associations(start: str, end: str):
-    sql = """
-      WITH items AS (
-        SELECT order_id, product_id
-        FROM transactions t JOIN time_dimension d ON d.date_key=t.date_key
-        WHERE d.date BETWEEN %s AND %s AND order_id IS NOT NULL AND product_id IS NOT NULL
-        GROUP BY order_id, product_id
-      )
-      SELECT a.product_id AS prod_a, b.product_id AS prod_b, COUNT(*) AS co_occurs
-      FROM items a JOIN items b ON a.order_id=b.order_id AND a.product_id<b.product_id
-      GROUP BY a.product_id, b.product_id
-      ORDER BY co_occurs DESC
-      LIMIT 100
-    """
-    return read_sql(sql, [start, end])
+    """Top co-purchased product pairs, built from one sorted product array per order."""
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET max_parallel_workers_per_gather = 4")
+        return fetch_frame(conn, ASSOCIATIONS_SQL, list(date_key_range(start, end)))
 
 assoc = associations(start_s, end_s)
 if assoc.empty:
@@ -1,13 +1,8 @@
-import os, sys, datetime as dt
+import datetime as dt
 import streamlit as st
 import pandas as pd
 
-_ROOT = os.path.dirname(os.path.dirname(__file__))
-_SRC = os.path.join(_ROOT, "src")
-if _SRC not in sys.path:
-    sys.path.insert(0, _SRC)
-
-from data_pipeline.bi.db import read_sql
+from data_pipeline.bi.db import count_distinct_sql, date_key_range, read_one
 
 st.set_page_config(page_title="Command Center", layout="wide")
 st.title("Business Intelligence Command Center")
@@ -19,14 +14,15 @@ start_s, end_s = start_date.isoformat(), end_date.isoformat()
 
 @st.cache_data(ttl=60)
 def summary(start: str, end: str):
-    sql = """
+    """Revenue, orders and customers for the range; customers is an HLL estimate when BI_USE_HLL is set."""
+    sql = f"""
       SELECT SUM(revenue) AS revenue,
              COUNT(*) AS orders,
-             COUNT(DISTINCT customer_id) AS customers
-      FROM transactions t JOIN time_dimension d ON d.date_key=t.date_key
-      WHERE d.date BETWEEN %s AND %s
+             {count_distinct_sql('customer_id')} AS customers
+      FROM transactions
+      WHERE date_key BETWEEN %s AND %s
     """
-    return read_sql(sql, [start, end]).iloc[0]
+    return read_one(sql, list(date_key_range(start, end)))
 
 s = summary(start_s, end_s)
 col1, col2, col3 = st.columns(3)
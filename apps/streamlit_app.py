@@ -2,6 +2,8 @@ import os
 import sys
 import streamlit as st
 
+# Fallback for running without `pip install -e .`; the entry script runs before
+# every page, so pages import data_pipeline directly.
 _ROOT = os.path.dirname(os.path.dirname(__file__))
 _SRC = os.path.join(_ROOT, "src")
 if _SRC not in sys.path:
@@ -23,3 +25,14 @@ st.markdown(
 
 st.info("Ensure POSTGRES_DSN is set and scripts/init_db_pg.py + scripts/load_to_db_pg.py were run.")
 
+if os.environ.get("BI_DEBUG", "").lower() in {"1", "true", "yes"}:
+    from data_pipeline.bi.db import clear_sql_cache, sql_cache_stats
+
+    with st.sidebar.expander("SQL cache"):
+        stats = sql_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        st.write(stats)
+        st.metric("Hit rate", f"{stats['hits'] / lookups:.0%}" if lookups else "n/a")
+        if st.button("Clear SQL cache"):
+            clear_sql_cache()
+
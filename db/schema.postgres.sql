@@ -77,9 +77,23 @@ CREATE TABLE IF NOT EXISTS transactions (
 
 CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date_key);
 CREATE INDEX IF NOT EXISTS idx_tx_customer ON transactions(customer_id);
+CREATE INDEX IF NOT EXISTS idx_tx_customer_date ON transactions(customer_id, date_key);
 CREATE INDEX IF NOT EXISTS idx_tx_product ON transactions(product_id);
 CREATE INDEX IF NOT EXISTS idx_tx_payment ON transactions(payment_method);
 CREATE INDEX IF NOT EXISTS idx_tx_geo ON transactions(state, city);
 CREATE INDEX IF NOT EXISTS idx_tx_prime ON transactions(is_prime_member);
 CREATE INDEX IF NOT EXISTS idx_tx_returned ON transactions(is_returned);
 
+-- Covering indexes for date-range dashboard queries (index-only scans once the
+-- visibility map is current, i.e. after VACUUM/ANALYZE following a load)
+CREATE INDEX IF NOT EXISTS idx_tx_date_delivery ON transactions(date_key)
+  INCLUDE (state, city, delivery_days) WHERE delivery_days IS NOT NULL;        -- Delivery Performance
+CREATE INDEX IF NOT EXISTS idx_tx_date_payment ON transactions(date_key)
+  INCLUDE (payment_method, revenue) WHERE payment_method IS NOT NULL;          -- Payment Analytics
+CREATE INDEX IF NOT EXISTS idx_tx_date_returns ON transactions(date_key)
+  INCLUDE (product_id, revenue, quantity, is_returned);                         -- Returns
+CREATE INDEX IF NOT EXISTS idx_tx_date_order_product ON transactions(date_key, order_id, product_id)
+  WHERE order_id IS NOT NULL AND product_id IS NOT NULL;                        -- Cross-sell baskets
+-- Optional, once after the initial load (takes an exclusive lock): keep the heap in date order
+-- CLUSTER transactions USING idx_tx_date;
+
@@ -9,6 +9,7 @@ import argparse
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List
 
 # Make src/ importable when running directly
@@ -53,7 +54,8 @@ def process_file(input_path: str, output_path: str, report_path: str, config_pat
 
     Returns the final report dict with step summaries and DQ stats.
     """
-    raw_df = pd.read_csv(input_path)
+    # pyarrow parser, NumPy dtypes: the cleaning steps expect NumPy-backed columns
+    raw_df = pd.read_csv(input_path, engine="pyarrow")
     cfg = load_config(config_path)
     cleaned_df, step_report = run_cleaning_df(raw_df, cfg)
     cleaned_df.to_csv(output_path, index=False)
@@ -70,6 +72,7 @@ def main():
     ap.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"), help="Directory containing CSV files")
     ap.add_argument("--out-dir", help="Output directory for cleaned CSVs and reports (default: <data-dir>/cleaned)")
     ap.add_argument("--overwrite", action="store_true", help="Overwrite existing outputs")
+    ap.add_argument("--workers", type=int, help="Parallel worker processes (default: CPU count)")
     args = ap.parse_args()
 
     data_dir = args.data_dir
@@ -81,7 +84,7 @@ def main():
         print(f"No CSV files found in {data_dir}")
         return 0
 
-    summaries = []
+    jobs = []
     for f in files:
         cfg = choose_config_for_file(f)
         base = os.path.splitext(os.path.basename(f))[0]
@@ -91,8 +94,16 @@ def main():
             print(f"Skip existing: {f}")
             continue
         print(f"Cleaning: {f} -> {out_csv} (config: {os.path.basename(cfg)})")
-        rep = process_file(f, out_csv, out_rep, cfg)
-        summaries.append(rep)
+        jobs.append((f, out_csv, out_rep, cfg))
+
+    # Files are independent (own input, own outputs), so clean them in parallel
+    summaries = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(args.workers or os.cpu_count() or 1, len(jobs))) as ex:
+            futs = [ex.submit(process_file, *job) for job in jobs]
+            for fut in as_completed(futs):
+                summaries.append(fut.result())
+        summaries.sort(key=lambda s: s["file"])
 
     print("\nBatch complete. Summary:")
     for s in summaries:
@@ -18,7 +18,7 @@ def main():
     schema_path = os.path.join(_ROOT, "db", "schema.postgres.sql")
     conn = connect_postgres()
     execute_sql_file(conn, schema_path)
-    populate_time_dimension_pg(conn, date(2015, 1, 1), date(2025, 12, 31), fiscal_year_start_month=4)
+    populate_time_dimension_pg(conn, date(2015, 1, 1), date(2025, 12, 31), fiscal_year_start_month=4, bulk=True)
     print("Initialized Postgres schema (analytics) and populated time_dimension.")
     return 0
 
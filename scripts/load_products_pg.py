@@ -3,6 +3,7 @@
 import os
 import sys
 import pandas as pd
+from psycopg2.extras import execute_values
 
 # Ensure src/ importable
 _ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -54,21 +55,22 @@ def upsert_products(conn, df: pd.DataFrame):
 
     # Build dynamic SQL
     tgt_cols = [cols[c] for c in present]
-    placeholders = ",".join(["%s"] * len(tgt_cols))
     col_list = ",".join(tgt_cols)
     # Qualify target table columns to avoid ambiguity in DO UPDATE
     set_updates = ", ".join([f"{c}=COALESCE(EXCLUDED.{c}, products.{c})" for c in tgt_cols if c != 'product_id'])
 
+    # Plain Python values with None for NA, sent in pages of 1000 rows per statement
+    rows = list(sub.astype(object).where(sub.notna(), None).itertuples(index=False, name=None))
     with conn.cursor() as cur:
-        for _, row in sub.iterrows():
-            values = [row.get(src) for src in present]
-            cur.execute(
-                f"""
-                INSERT INTO products ({col_list}) VALUES ({placeholders})
-                ON CONFLICT (product_id) DO UPDATE SET {set_updates}
-                """,
-                values,
-            )
+        execute_values(
+            cur,
+            f"""
+            INSERT INTO products ({col_list}) VALUES %s
+            ON CONFLICT (product_id) DO UPDATE SET {set_updates}
+            """,
+            rows,
+            page_size=1000,
+        )
     conn.commit()
 
 
@@ -78,7 +80,7 @@ def main():
     if not path:
         print("Catalog file not found in data/ or data/cleaned/. Expected amazon_india_products_catalog.csv")
         return 1
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
     conn = connect_postgres()
     upsert_products(conn, df)
     print(f"Upserted {df.shape[0]} product records from {os.path.basename(path)}")
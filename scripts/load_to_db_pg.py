@@ -7,7 +7,10 @@ supports fact-level category/brand as fallbacks for segmentation.
 import os
 import sys
 from io import StringIO
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from psycopg2.extras import execute_values
 
 # Ensure src/ importable
 _ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -37,6 +40,67 @@ DISCOUNT_CANDS = ["discount_pct", "discount"]
 RETURN_CANDS = ["is_returned", "returned"]
 
 
+# Every column main() may pick; anything else in a cleaned file is never read
+LOAD_COLS = {
+    c for cands in (
+        DATE_CANDS, REV_CANDS, QTY_CANDS, UNIT_PRICE_CANDS, ORDER_ID_CANDS, CUSTOMER_CANDS, PRODUCT_CANDS,
+        CATEGORY_CANDS, BRAND_CANDS, PAYMENT_CANDS, CITY_CANDS, STATE_CANDS, PRIME_CANDS, DELIVERY_CANDS,
+        RATING_CANDS, DISCOUNT_CANDS, RETURN_CANDS,
+    ) for c in cands
+}
+
+
+# Fact column -> candidate source columns (date_key/order_date are derived separately)
+FACT_CANDS = {
+    "order_id": ORDER_ID_CANDS,
+    "customer_id": CUSTOMER_CANDS,
+    "product_id": PRODUCT_CANDS,
+    "quantity": QTY_CANDS,
+    "unit_price": UNIT_PRICE_CANDS,
+    "revenue": REV_CANDS,
+    "category": CATEGORY_CANDS,
+    "brand": BRAND_CANDS,
+    "payment_method": PAYMENT_CANDS,
+    "city": CITY_CANDS,
+    "state": STATE_CANDS,
+    "is_prime_member": PRIME_CANDS,
+    "delivery_days": DELIVERY_CANDS,
+    "customer_rating": RATING_CANDS,
+    "discount_pct": DISCOUNT_CANDS,
+    "is_returned": RETURN_CANDS,
+}
+NUMERIC_FACT_COLS = ["quantity", "unit_price", "revenue", "delivery_days", "customer_rating", "discount_pct"]
+
+
+def read_cleaned_csv(path: str) -> pd.DataFrame:
+    """Read only the loadable columns of a cleaned CSV with the pyarrow parser and dtypes."""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if c in LOAD_COLS]
+    return pd.read_csv(path, usecols=usecols, engine="pyarrow", dtype_backend="pyarrow")
+
+
+def to_days(s: pd.Series) -> np.ndarray:
+    """Return ``s`` as a ``datetime64[D]`` array (NaT for missing/unparseable).
+
+    Arrow ``date32`` columns from the pyarrow CSV reader are cast directly;
+    anything else goes through ``pd.to_datetime``.
+    """
+    if isinstance(s.dtype, pd.ArrowDtype) and pa.types.is_date(s.dtype.pyarrow_dtype):
+        s = s.astype("timestamp[s][pyarrow]")
+    elif not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors='coerce')
+    return s.to_numpy(dtype="datetime64[s]", na_value=np.datetime64("NaT")).astype("datetime64[D]")
+
+
+def date_keys_from_days(days: np.ndarray) -> pd.Series:
+    """YYYYMMDD ``Int64`` keys for a ``datetime64[D]`` array, using integer arithmetic only."""
+    months = days.astype("datetime64[M]")
+    y = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    m = months.astype(np.int64) % 12 + 1
+    d = (days - months).astype(np.int64) + 1
+    return pd.Series(pd.arrays.IntegerArray(y * 10000 + m * 100 + d, np.isnat(days)))
+
+
 def pick(df: pd.DataFrame, cands):
     """Return the first matching column name present in ``df`` from ``cands``."""
     for c in cands:
@@ -45,14 +109,24 @@ def pick(df: pd.DataFrame, cands):
     return None
 
 
+# Rows serialized per COPY call; caps the CSV buffer held in memory
+COPY_CHUNK_ROWS = 100_000
+
+
 def dataframe_to_copy_buffer(df: pd.DataFrame) -> StringIO:
-    """Serialize a DataFrame to a CSV StringIO buffer for COPY."""
+    """Serialize a DataFrame to a CSV StringIO buffer for COPY (NA as empty)."""
     buf = StringIO()
-    df.to_csv(buf, index=False, header=False)
+    df.to_csv(buf, index=False, header=False, na_rep='')
     buf.seek(0)
     return buf
 
 
+def copy_dataframe(cur, copy_sql: str, df: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+    """COPY ``df`` in slices of ``chunk_rows`` so only one slice is ever text in RAM."""
+    for start in range(0, len(df), chunk_rows):
+        cur.copy_expert(copy_sql, dataframe_to_copy_buffer(df.iloc[start:start + chunk_rows]))
+
+
 def upsert_dimension(conn, table: str, key_col: str, cols: list[str], df: pd.DataFrame):
     """Idempotent upsert for small dimension slices using INSERT .. ON CONFLICT DO NOTHING."""
     if key_col not in df.columns:
@@ -61,28 +135,28 @@ def upsert_dimension(conn, table: str, key_col: str, cols: list[str], df: pd.Dat
     if sub.empty:
         return
     tmp_cols = ",".join(cols)
-    placeholders = ",".join(["%s"] * len(cols))
+    rows = list(sub.astype(object).where(sub.notna(), None).itertuples(index=False, name=None))
     with conn.cursor() as cur:
-        for _, row in sub.iterrows():
-            values = [row.get(c) for c in cols]
-            cur.execute(
-                f"INSERT INTO {table} ({tmp_cols}) VALUES ({placeholders}) ON CONFLICT ({key_col}) DO NOTHING",
-                values,
-            )
+        execute_values(
+            cur,
+            f"INSERT INTO {table} ({tmp_cols}) VALUES %s ON CONFLICT ({key_col}) DO NOTHING",
+            rows,
+            page_size=1000,
+        )
     conn.commit()
 
 
 def main():
-    """Walk data/cleaned, load each CSV into analytics.transactions via COPY."""
+    """Walk data/cleaned, load each CSV (plain or .csv.gz) into analytics.transactions via COPY."""
     cleaned_dir = os.path.join(_ROOT, "data", "cleaned")
     conn = connect_postgres()
     cur = conn.cursor()
 
     for name in sorted(os.listdir(cleaned_dir)):
-        if not name.lower().endswith(".csv"):
+        if not name.lower().endswith((".csv", ".csv.gz")):
             continue
         path = os.path.join(cleaned_dir, name)
-        df = pd.read_csv(path)
+        df = read_cleaned_csv(path)
         if df.empty:
             continue
 
@@ -92,19 +166,9 @@ def main():
         rev_col = pick(df, REV_CANDS)
         if not (date_col and rev_col):
             continue
-        qty_col = pick(df, QTY_CANDS)
-        unit_col = pick(df, UNIT_PRICE_CANDS)
-        order_col = pick(df, ORDER_ID_CANDS)
-        pay_col = pick(df, PAYMENT_CANDS)
         city_col = pick(df, CITY_CANDS)
         state_col = pick(df, STATE_CANDS)
         prime_col = pick(df, PRIME_CANDS)
-        deliv_col = pick(df, DELIVERY_CANDS)
-        rating_col = pick(df, RATING_CANDS)
-        disc_col = pick(df, DISCOUNT_CANDS)
-        ret_col = pick(df, RETURN_CANDS)
-        cat_col = pick(df, CATEGORY_CANDS)
-        brand_col = pick(df, BRAND_CANDS)
 
         # Upsert minimal dimensions if available
         if prod_col:
@@ -120,71 +184,38 @@ def main():
             upsert_dimension(conn, "customers", "customer_id", ["customer_id", "city", "state", "is_prime_member"], small)
 
         # Prepare fact rows
-        dates = pd.to_datetime(df[date_col], errors='coerce')
-        date_keys = (dates.dt.year*10000 + dates.dt.month*100 + dates.dt.day).astype('Int64')
-
-        tx = pd.DataFrame({
-            "order_id": df[order_col] if order_col in df.columns else None,
-            "date_key": date_keys,
-            "order_date": dates.dt.date.astype('string'),
-            "customer_id": df[cust_col] if cust_col in df.columns else None,
-            "product_id": df[prod_col] if prod_col in df.columns else None,
-            "quantity": pd.to_numeric(df[qty_col], errors='coerce') if qty_col in df.columns else 1,
-            "unit_price": pd.to_numeric(df[unit_col], errors='coerce') if unit_col in df.columns else None,
-            "revenue": pd.to_numeric(df[rev_col], errors='coerce') if rev_col in df.columns else None,
-            "category": df[cat_col] if cat_col in df.columns else None,
-            "brand": df[brand_col] if brand_col in df.columns else None,
-            "payment_method": df[pay_col] if pay_col in df.columns else None,
-            "city": df[city_col] if city_col in df.columns else None,
-            "state": df[state_col] if state_col in df.columns else None,
-            "is_prime_member": df[prime_col] if prime_col in df.columns else None,
-            "delivery_days": pd.to_numeric(df[deliv_col], errors='coerce') if deliv_col in df.columns else None,
-            "customer_rating": pd.to_numeric(df[rating_col], errors='coerce') if rating_col in df.columns else None,
-            "discount_pct": pd.to_numeric(df[disc_col], errors='coerce') if disc_col in df.columns else None,
-            "is_returned": df[ret_col] if ret_col in df.columns else None,
-            "source_file": name,
-        })
+        days = to_days(df[date_col])
+
+        # Fact columns straight from their source columns; coerce only non-numeric ones
+        mapping = {tgt: src for tgt, cands in FACT_CANDS.items() if (src := pick(df, cands))}
+        tx = pd.DataFrame({tgt: df[src] for tgt, src in mapping.items()})
+        for c in NUMERIC_FACT_COLS:
+            if c in tx.columns and not pd.api.types.is_numeric_dtype(tx[c]):
+                tx[c] = pd.to_numeric(tx[c], errors='coerce')
+        tx["date_key"] = date_keys_from_days(days).set_axis(tx.index)
+        tx["order_date"] = pd.Series(np.datetime_as_string(days), index=tx.index, dtype='string').mask(np.isnat(days))
+        if "quantity" not in tx.columns:
+            tx["quantity"] = 1
+        tx["source_file"] = name
 
         # Normalize dtypes for COPY (avoid 6.0 into INTEGER, avoid <NA> literals)
-        tx["date_key"] = pd.to_numeric(tx["date_key"], errors='coerce').astype('Int64')
-        tx["delivery_days"] = pd.to_numeric(tx["delivery_days"], errors='coerce').astype('Int64')
+        if "delivery_days" in tx.columns:
+            tx["delivery_days"] = tx["delivery_days"].astype('Int64')
 
-        # Build string-safe output with empty for NULLs
         cols = [
             "order_id","date_key","order_date","customer_id","product_id","quantity","unit_price","revenue",
             "category","brand",
             "payment_method","city","state","is_prime_member","delivery_days","customer_rating","discount_pct","is_returned","source_file"
         ]
-        out = tx[cols].copy()
-
-        # Integers as plain ints or empty
-        for c in ["date_key", "delivery_days"]:
-            if c in out.columns:
-                out[c] = out[c].apply(lambda v: '' if pd.isna(v) else str(int(v)))
+        out = tx.reindex(columns=cols)
 
-        # Booleans to 't'/'f' or empty
+        # Booleans to 't'/'f'; everything else (Int64, floats, string dates, text)
+        # is written as-is, with NA rendered as the empty NULL marker by to_csv
         for c in ["is_prime_member", "is_returned"]:
-            if c in out.columns:
-                out[c] = out[c].map(lambda v: '' if pd.isna(v) else ('t' if bool(v) else 'f'))
-
-        # Dates: ensure empty for NA
-        out["order_date"] = out["order_date"].map(lambda v: '' if pd.isna(v) or v in (None, 'NaT', '<NA>') else str(v))
-
-        # Numerics keep as-is but empty for NA
-        for c in ["quantity", "unit_price", "revenue", "customer_rating", "discount_pct"]:
-            if c in out.columns:
-                out[c] = out[c].apply(lambda v: '' if pd.isna(v) else str(v))
-
-        # Texts: empty for NA
-        for c in ["order_id","customer_id","product_id","category","brand","payment_method","city","state","source_file"]:
-            if c in out.columns:
-                out[c] = out[c].map(lambda v: '' if pd.isna(v) else str(v))
+            out[c] = out[c].map({True: 't', False: 'f'})
 
-        buf = StringIO()
-        out.to_csv(buf, index=False, header=False)
-        buf.seek(0)
         copy_sql = f"COPY transactions ({', '.join(cols)}) FROM STDIN WITH CSV NULL ''"
-        cur.copy_expert(copy_sql, buf)
+        copy_dataframe(cur, copy_sql, out)
         conn.commit()
         print(f"Loaded {len(tx)} rows from {name} into transactions")
 
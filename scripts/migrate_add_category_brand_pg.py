@@ -18,13 +18,19 @@ from data_pipeline.db_pg_utils import connect_postgres
 def main():
     """Execute ALTER TABLEs and supporting indexes under the analytics schema."""
     conn = connect_postgres()
+    # IF NOT EXISTS makes each statement idempotent, so no explicit transaction
+    # is needed; CONCURRENTLY also refuses to run inside one
+    conn.autocommit = True
     with conn.cursor() as cur:
-        cur.execute("SET search_path = analytics, public;")
-        cur.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category TEXT;")
-        cur.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS brand TEXT;")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(category);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tx_brand ON transactions(brand);")
-    conn.commit()
+        # a multi-statement query still runs atomically, as one implicit transaction
+        cur.execute(
+            """
+            ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category TEXT;
+            ALTER TABLE transactions ADD COLUMN IF NOT EXISTS brand TEXT;
+            """
+        )
+        cur.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_category ON transactions(category);")
+        cur.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_brand ON transactions(brand);")
     print("Migrated: added transactions.category and transactions.brand with indexes.")
     return 0
 
@@ -0,0 +1,98 @@
+"""Create (if missing) and refresh the dashboard materialized views.
+
+``mv_revenue_monthly`` pre-aggregates the fact table to one row per
+(year, month, category) for the trend/financial dashboards.
+``transactions_enriched`` is the fact table with the product dimension's
+category/brand folded in (``category_eff``/``brand_eff``), so interactive
+pages filter and group on one relation instead of joining ``products`` per
+query. ``mv_brand_price`` holds the all-time median unit price and units per
+(brand, category), built from ``transactions_enriched``. All require the
+``transactions.category``/``brand`` columns from
+``migrate_add_category_brand_pg.py``. Schedule nightly, after
+``load_to_db_pg.py``.
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(__file__))
+_SRC = os.path.join(_ROOT, "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+from data_pipeline.db_pg_utils import connect_postgres
+
+
+MV_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_revenue_monthly AS
+SELECT d.year, d.month,
+       COALESCE(p.category, t.category, 'Unknown') AS category,
+       SUM(t.revenue) AS revenue
+FROM transactions t
+JOIN time_dimension d ON d.date_key = t.date_key
+LEFT JOIN products p ON p.product_id = t.product_id
+GROUP BY 1, 2, 3
+WITH NO DATA;
+"""
+
+ENRICHED_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS transactions_enriched AS
+SELECT t.*,
+       COALESCE(p.category, t.category, 'Unknown') AS category_eff,
+       COALESCE(p.brand, t.brand, 'Unknown') AS brand_eff
+FROM transactions t
+LEFT JOIN products p USING (product_id)
+WITH NO DATA;
+"""
+
+BRAND_PRICE_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_brand_price AS
+SELECT brand_eff AS brand, category_eff AS category,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY unit_price) AS median_price,
+       SUM(quantity) AS units
+FROM transactions_enriched
+WHERE unit_price IS NOT NULL
+GROUP BY 1, 2
+WITH NO DATA;
+"""
+
+# (view, CREATE statement, index statements); the first index must be UNIQUE.
+# Views are refreshed in list order, so dependents come after their sources.
+VIEWS = [
+    ("mv_revenue_monthly", MV_SQL, [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_revenue_monthly ON mv_revenue_monthly(year, month, category);",
+    ]),
+    ("transactions_enriched", ENRICHED_SQL, [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_tx_enriched_id ON transactions_enriched(tx_id);",
+        "CREATE INDEX IF NOT EXISTS idx_tx_enriched_date_cat ON transactions_enriched(date_key, category_eff);",
+        "CREATE INDEX IF NOT EXISTS idx_tx_enriched_date_brand ON transactions_enriched(date_key, brand_eff);",
+    ]),
+    ("mv_brand_price", BRAND_PRICE_SQL, [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_brand_price ON mv_brand_price(category, brand);",
+    ]),
+]
+
+
+def main():
+    """Create each view and its indexes, then refresh it."""
+    conn = connect_postgres()
+    with conn.cursor() as cur:
+        for name, create_sql, index_sqls in VIEWS:
+            cur.execute(create_sql)
+            for index_sql in index_sqls:
+                cur.execute(index_sql)
+            cur.execute(
+                "SELECT ispopulated FROM pg_matviews "
+                "WHERE schemaname = 'analytics' AND matviewname = %s;",
+                (name,),
+            )
+            populated = bool(cur.fetchone()[0])
+            # CONCURRENTLY keeps the view readable during refresh but needs existing data
+            cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if populated else ''}{name};")
+            print(f"Refreshed analytics.{name}.")
+    conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
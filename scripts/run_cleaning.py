@@ -5,7 +5,10 @@ orchestrated cleaning steps, writes the cleaned CSV, and optionally emits
 an on-disk JSON report with per-step summaries and data-quality stats.
 """
 
+from __future__ import annotations
+
 import argparse, json, os, sys
+from typing import TYPE_CHECKING, Optional, Union
 
 # Make src/ importable when running directly
 _ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -13,9 +16,67 @@ _SRC = os.path.join(_ROOT, "src")
 if _SRC not in sys.path:
     sys.path.insert(0, _SRC)
 
-from data_pipeline.config import load_config
-from data_pipeline.pd_pipeline import run_cleaning_df, dq_report_df
-import pandas as pd
+# pandas/pyarrow and the pipeline are imported where used, so --help and
+# argument errors return without paying their import cost
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+def open_output(path: str, compress: Optional[str] = None) -> pa.NativeFile:
+    """Open ``path`` for writing, compressed with ``compress`` (``gzip``/``zstd``).
+
+    ``None`` picks the codec from the extension (``.gz``, ``.zst``, ...) and
+    ``"none"`` always writes plain bytes.
+    """
+    import pyarrow as pa
+
+    codec = "detect" if compress is None else (None if compress == "none" else compress)
+    return pa.output_stream(path, compression=codec)
+
+
+def write_cleaned_csv(df: pd.DataFrame, out: Union[str, pa.NativeFile], header: bool = True) -> None:
+    """Write ``df`` as CSV with Arrow's multi-threaded writer.
+
+    Arrow quotes the header and every string value, writes booleans as
+    ``true``/``false`` and whole floats without ``.0``; the file reads back to
+    the same values as ``DataFrame.to_csv`` output. ``header=False`` continues
+    an earlier write to the same stream.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, out, pa_csv.WriteOptions(include_header=header, quoting_style="needed"))
+
+
+def clean_in_chunks(input_path: str, output_path: str, cfg, chunksize: int,
+                    compress: Optional[str] = None, workers: int = 1) -> dict:
+    """Stream ``input_path`` through the pipeline ``chunksize`` rows at a time.
+
+    Each cleaned chunk is appended to ``output_path`` with the same writer as
+    the whole-file path, so peak memory is one chunk rather than the whole
+    file. Returns a report with per-chunk step summaries and DQ counts summed
+    over all chunks.
+    """
+    import pandas as pd
+    from data_pipeline.pd_pipeline import dq_report_df, run_cleaning_df
+
+    steps = []
+    dq = {"rows_before": 0, "rows_after": 0, "missing_before": {}, "missing_after": {}}
+    with open_output(output_path, compress) as out:
+        for i, raw_df in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            cleaned_df, step_report = run_cleaning_df(raw_df, cfg, workers=workers)
+            write_cleaned_csv(cleaned_df, out, header=(i == 0))
+            steps.append(step_report)
+            part = dq_report_df(raw_df, cleaned_df)
+            dq["rows_before"] += part["rows_before"]
+            dq["rows_after"] += part["rows_after"]
+            for key in ("missing_before", "missing_after"):
+                for col, n in part[key].items():
+                    dq[key][col] = dq[key].get(col, 0) + int(n)
+    return {"steps": steps, "dq": dq}
+
 
 def main():
     """Parse CLI arguments and run the cleaning pipeline.
@@ -29,26 +90,42 @@ def main():
     ap.add_argument("--output", required=True, help="Output cleaned CSV")
     ap.add_argument("--config", required=True, help="Cleaning config JSON")
     ap.add_argument("--report", required=False, help="Write JSON report to this path")
+    ap.add_argument("--compress", choices=["none", "gzip", "zstd"],
+                    help="Compress the output CSV (default: by --output extension, e.g. .gz/.zst)")
+    ap.add_argument("--chunksize", type=int, help="Clean the input in chunks of this many rows to bound memory. "
+                    "Imputation statistics, dedup and outlier checks then apply within each chunk")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Threads for the per-column cleaning steps (default: 1, sequential)")
     args = ap.parse_args()
 
-    # Read raw CSV into a DataFrame
-    raw_df = pd.read_csv(args.input)
+    import pandas as pd
+    from data_pipeline.config import load_config
+    from data_pipeline.pd_pipeline import dq_report_df, run_cleaning_df
+
     cfg = load_config(args.config)
+    if args.chunksize:
+        final_report = clean_in_chunks(args.input, args.output, cfg, args.chunksize, args.compress, args.workers)
+    else:
+        # Read raw CSV into a DataFrame
+        raw_df = pd.read_csv(args.input, engine="pyarrow")
 
-    # Execute all configured cleaning steps, collecting a per-step report
-    cleaned_df, step_report = run_cleaning_df(raw_df, cfg)
-    cleaned_df.to_csv(args.output, index=False)
+        # Execute all configured cleaning steps, collecting a per-step report
+        cleaned_df, step_report = run_cleaning_df(raw_df, cfg, workers=args.workers)
+        with open_output(args.output, args.compress) as out:
+            write_cleaned_csv(cleaned_df, out)
 
-    # Build an overall DQ report before/after cleaning
-    dq = dq_report_df(raw_df, cleaned_df)
-    final_report = {"steps": step_report, "dq": dq}
+        # Build an overall DQ report before/after cleaning
+        dq = dq_report_df(raw_df, cleaned_df)
+        final_report = {"steps": step_report, "dq": dq}
 
+    # Serialize once; the same text goes to the report file and stdout
+    payload = json.dumps(final_report, indent=2, ensure_ascii=False)
     if args.report:
         with open(args.report, "w", encoding="utf-8") as f:
-            json.dump(final_report, f, indent=2, ensure_ascii=False)
+            f.write(payload)
 
     print("Cleaning completed.")
-    print(json.dumps(final_report, indent=2, ensure_ascii=False))
+    print(payload)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,80 @@
+"""On-disk parquet cache for expensive dashboard queries.
+
+``st.cache_data`` only lives as long as the Streamlit process and its TTL.
+``cached_query`` sits underneath it and persists results as parquet files,
+so a cohort or window query that ran once is reloaded from disk by later
+sessions and restarts until ``ttl_disk`` expires. File names include a digest
+of the query's SQL and the wrapped function's source, so editing either misses
+the old files instead of serving them.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from .db import DTYPE_BACKEND
+
+
+def cache_dir() -> Path:
+    """Directory for cached parquet files (``BI_CACHE_DIR`` env, default ``.cache``)."""
+    return Path(os.getenv("BI_CACHE_DIR", ".cache"))
+
+
+def _code_digest(fn: Callable[..., Any], sql: Optional[str]) -> str:
+    """Short digest of ``sql`` and ``fn``'s source (bytecode if the source is unavailable)."""
+    try:
+        code = inspect.getsource(fn).encode()
+    except (OSError, TypeError):
+        code = fn.__code__.co_code
+    return hashlib.sha1((sql or "").encode() + b"\0" + code).hexdigest()[:12]
+
+
+def cached_query(key: str, sql: Optional[str] = None,
+                 ttl_disk: int = 3600) -> Callable[[Callable[..., pd.DataFrame]], Callable[..., pd.DataFrame]]:
+    """Decorate a DataFrame-returning query with a parquet cache on disk.
+
+    Files are named ``<key>-<code digest>-<sha1 of pickled args>.parquet``,
+    where the code digest covers ``sql`` (pass the query text the function
+    runs) and the function's source. A file younger than ``ttl_disk`` seconds
+    is returned instead of calling the function, so results may lag a data
+    reload by up to ``ttl_disk``. Cache I/O errors are never fatal — the query
+    just runs.
+    """
+    def decorator(fn: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        version = _code_digest(fn, sql)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> pd.DataFrame:
+            digest = hashlib.sha1(pickle.dumps((args, sorted(kwargs.items())))).hexdigest()
+            path = cache_dir() / f"{key}-{version}-{digest}.parquet"
+            try:
+                if time.time() - path.stat().st_mtime < ttl_disk:
+                    return pd.read_parquet(path, dtype_backend=DTYPE_BACKEND)
+            except Exception:
+                pass
+            df = fn(*args, **kwargs)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # unique temp name: sessions are threads of one process and may
+                # miss on the same key at once
+                fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp")
+                os.close(fd)
+                try:
+                    df.to_parquet(tmp, compression="zstd")
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+            except Exception:
+                pass
+            return df
+        return wrapper
+    return decorator
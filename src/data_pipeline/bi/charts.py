@@ -0,0 +1,80 @@
+"""Helpers for preparing chart data before it is handed to Plotly."""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Above this many points scatter plots are drawn as a binned density heatmap
+RASTER_MIN_POINTS = 50_000
+
+
+def m4_downsample(df: pd.DataFrame, y: str, max_points: int = 1000) -> pd.DataFrame:
+    """Reduce an x-sorted series to at most ``max_points`` rows using M4.
+
+    Rows are split into ``max_points // 4`` equal-width buckets by position and
+    only the first, last, min and max row of each bucket are kept, which
+    preserves the visual envelope of the series. Frames already under the
+    limit are returned unchanged.
+    """
+    n = len(df)
+    buckets = max(1, max_points // 4)
+    if n <= max_points:
+        return df
+    pos = np.arange(n)
+    bucket = pos * buckets // n
+    vals = pd.Series(df[y].to_numpy(dtype=np.float64), index=pos).fillna(0.0)
+    grouped = vals.groupby(bucket)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:] - 1, n - 1]
+    keep = np.unique(np.concatenate([
+        starts, ends, grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy(),
+    ]))
+    return df.iloc[keep]
+
+
+def ranked_categorical(s: pd.Series) -> pd.Categorical:
+    """Ordered Categorical of ``s`` whose category order is the row order.
+
+    Ranked query results (already sorted by revenue) keep their order on the
+    chart axis while Plotly and pandas work on integer codes instead of strings.
+    """
+    return pd.Categorical(s, categories=pd.unique(s.to_numpy()), ordered=True)
+
+
+def density_heatmap(x: pd.Series, y: pd.Series, bins: int = 200,
+                    title: Optional[str] = None) -> go.Figure:
+    """Log-count 2D histogram of ``x`` vs ``y`` as a Plotly heatmap.
+
+    Stands in for a scatter plot when there are too many points to draw
+    individually: binning happens in NumPy and only ``bins**2`` cells are sent
+    to the browser.
+    """
+    xv = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    yv = y.to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.isfinite(xv) & np.isfinite(yv)
+    counts, xe, ye = np.histogram2d(xv[ok], yv[ok], bins=bins)
+    fig = go.Figure(go.Heatmap(
+        x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=np.log1p(counts.T),
+        colorscale="Viridis", colorbar=dict(title="log(1+n)"),
+    ))
+    fig.update_layout(title=title, xaxis_title=x.name, yaxis_title=y.name)
+    return fig
+
+
+def stacked_share_bars(df: pd.DataFrame, x: str, color: str, y: str) -> go.Figure:
+    """Stacked bars of each ``color`` group's share of ``y`` at every ``x``.
+
+    The shares are normalized in pandas (one wide frame, rows summing to 1), so
+    Plotly just draws one ``go.Bar`` per group instead of re-stacking with
+    ``groupnorm``.
+    """
+    wide = df.groupby([x, color], sort=True)[y].sum().unstack(fill_value=0)
+    values = wide.to_numpy(dtype=np.float64)
+    totals = values.sum(axis=1, keepdims=True)
+    shares = np.divide(values, totals, out=np.zeros_like(values), where=totals != 0)
+    xs = wide.index.to_numpy()
+    fig = go.Figure([go.Bar(name=str(c), x=xs, y=shares[:, i], uid=str(c)) for i, c in enumerate(wide.columns)])
+    fig.update_layout(barmode="stack", xaxis_title=x, yaxis_title=f"{y} share", legend_title_text=color)
+    return fig
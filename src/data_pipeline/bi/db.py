@@ -1,11 +1,20 @@
 """Thin Postgres access layer for analytics queries used by Streamlit pages."""
 
+import hashlib
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
 import pandas as pd
 import psycopg2
+import psycopg2.extensions
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from psycopg2.pool import ThreadedConnectionPool
 
 
 def get_dsn() -> str:
@@ -13,23 +22,281 @@ def get_dsn() -> str:
     return os.environ.get("POSTGRES_DSN", "dbname=postgres user=postgres host=localhost password=postgres")
 
 
+def date_key_range(start: str, end: str) -> Tuple[int, int]:
+    """Map ISO ``start``/``end`` dates to inclusive ``date_key`` (YYYYMMDD) bounds.
+
+    ``date_key`` is monotonic in ``date``, so facts can be range-filtered on
+    ``t.date_key`` directly instead of joining ``time_dimension``.
+    """
+    return int(start.replace("-", "")), int(end.replace("-", ""))
+
+
+def use_hll() -> bool:
+    """Whether distinct counts should use the ``hll`` extension (``BI_USE_HLL=1``)."""
+    return os.environ.get("BI_USE_HLL", "").lower() in {"1", "true", "yes"}
+
+
+def count_distinct_sql(expr: str, where: Optional[str] = None) -> str:
+    """SQL for a distinct count of ``expr``: HyperLogLog estimate or exact.
+
+    ``where`` becomes the aggregate's ``FILTER`` clause. The HLL variant
+    (about 1% error) needs ``CREATE EXTENSION hll`` and is only emitted when
+    ``use_hll()`` is true.
+    """
+    agg_filter = f" FILTER (WHERE {where})" if where else ""
+    if use_hll():
+        return f"hll_cardinality(hll_add_agg(hll_hash_text(({expr})::text)){agg_filter})::bigint"
+    return f"COUNT(DISTINCT {expr}){agg_filter}"
+
+
+def product_join_sql(needed: Any) -> str:
+    """``LEFT JOIN products p`` when ``needed`` is truthy, else an empty string.
+
+    Pass the category filter (or any flag for a ``p.*`` column in use) so
+    queries that don't touch the product dimension skip the join entirely.
+    """
+    return "LEFT JOIN products p ON p.product_id = t.product_id" if needed else ""
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has PREPAREd."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: set = set()
+
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Return the process-wide Postgres pool, creating it on first use.
+
+    Connections are opened with the analytics ``search_path`` and UTF-8
+    client encoding as startup options, so no ``SET`` runs per query.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(1, 10, get_dsn(), options="-c search_path=analytics,public",
+                                           client_encoding="UTF8", connection_factory=PreparingConnection)
+        return _pool
+
+
 @contextmanager
 def get_conn():
-    """Context manager yielding a Postgres connection with analytics schema set."""
-    dsn = get_dsn()
-    conn = psycopg2.connect(dsn)
+    """Context manager lending a pooled Postgres connection with analytics schema set.
+
+    The transaction is rolled back before the connection goes back to the
+    pool, which also undoes any session ``SET`` issued by the caller.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
     try:
-        with conn.cursor() as cur:
-            cur.execute("SET search_path = analytics, public;")
         yield conn
     finally:
-        conn.close()
+        if not conn.closed:
+            conn.rollback()
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+DTYPE_BACKEND = "pyarrow"
+
+# Postgres NUMERIC arrives as ``decimal.Decimal``; analytics code wants floats
+_NUMERIC_OIDS = {1700}
+
+
+def _rows_to_frame(desc: Sequence[Any], rows: Sequence[Tuple[Any, ...]]) -> pd.DataFrame:
+    columns = list(zip(*rows)) if rows else [()] * len(desc)
+    arrays = []
+    for d, values in zip(desc, columns):
+        arr = pa.array(values, from_pandas=True)
+        arrays.append(arr.cast(pa.float64()) if d.type_code in _NUMERIC_OIDS else arr)
+    table = pa.Table.from_arrays(arrays, names=[d.name for d in desc])
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def fetch_frame(conn, sql: str, params: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+    """Run ``sql`` on ``conn`` and build an Arrow-backed DataFrame from the rows.
+
+    Used instead of ``pd.read_sql_query``: the rowset is fetched once and each
+    column becomes one ``pyarrow`` array, typed from the values (NUMERIC is
+    read as float64), with no per-row object conversion in pandas.
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return _rows_to_frame(cur.description, cur.fetchall())
+
+
+# Process-wide result cache for ``read_sql``/``read_sql_prepared``, shared by every page
+SQL_CACHE_SIZE = 128
+SQL_CACHE_TTL = 300
+
+_sql_cache: "OrderedDict[str, Tuple[float, pd.DataFrame]]" = OrderedDict()
+_sql_cache_lock = threading.Lock()
+_sql_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _sql_cache_key(sql: str, params: Optional[Iterable[Any]]) -> str:
+    return hashlib.blake2b((sql + repr(params)).encode(), digest_size=16).hexdigest()
+
+
+def cached_frame(sql: str, params: Optional[Iterable[Any]],
+                 load: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Return the cached result for ``(sql, params)``, calling ``load()`` on a miss.
+
+    This is the one result cache of the dashboard: ``read_sql`` and
+    ``queries.read_sql_prepared`` both go through it, so the same query
+    is shared across pages whichever path issues it. Entries live in an LRU
+    of ``SQL_CACHE_SIZE`` for ``SQL_CACHE_TTL`` seconds; callers get a copy
+    they may modify.
+    """
+    key = _sql_cache_key(sql, params)
+    now = time.monotonic()
+    with _sql_cache_lock:
+        hit = _sql_cache.get(key)
+        if hit is not None and now - hit[0] < SQL_CACHE_TTL:
+            _sql_cache.move_to_end(key)
+            _sql_cache_stats["hits"] += 1
+            return hit[1].copy()
+        _sql_cache_stats["misses"] += 1
+    df = load()
+    with _sql_cache_lock:
+        _sql_cache[key] = (now, df)
+        _sql_cache.move_to_end(key)
+        while len(_sql_cache) > SQL_CACHE_SIZE:
+            _sql_cache.popitem(last=False)
+            _sql_cache_stats["evictions"] += 1
+    return df.copy()
 
 
 def read_sql(sql: str, params: Optional[Iterable[Any]] = None) -> pd.DataFrame:
     """Execute a SQL query and return a pandas DataFrame.
 
-    Automatically opens/closes a connection using ``get_conn``.
+    Automatically opens/closes a connection using ``get_conn``. Columns are
+    Arrow-backed (``fetch_frame``) so strings are not boxed Python objects.
+    Results go through the shared ``cached_frame`` LRU keyed on
+    ``(sql, params)``.
     """
+    def load() -> pd.DataFrame:
+        with get_conn() as conn:
+            return fetch_frame(conn, sql, params)
+
+    return cached_frame(sql, params, load)
+
+
+def sql_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters and current size of the shared result cache."""
+    with _sql_cache_lock:
+        return {**_sql_cache_stats, "size": len(_sql_cache)}
+
+
+def clear_sql_cache() -> None:
+    """Drop all cached query results (counters are kept)."""
+    with _sql_cache_lock:
+        _sql_cache.clear()
+
+
+def iter_sql_frames(sql: str, params: Optional[Iterable[Any]] = None,
+                    chunksize: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Yield the result of ``sql`` as DataFrames of at most ``chunksize`` rows.
+
+    Rows stay on the server behind a named (server-side) cursor and are pulled
+    one batch at a time, so client memory is bounded by ``chunksize`` instead
+    of the full result. Frames have the same dtypes as ``fetch_frame``. The
+    pooled connection is held until the generator is exhausted or closed, and
+    results are not cached.
+    """
+    with get_conn() as conn:
+        with conn.cursor(name=f"srv_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunksize
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield _rows_to_frame(cur.description, rows)
+
+
+# Arrow type for each Postgres type OID in a COPY CSV result; other types
+# (timestamptz, json, arrays, ...) are left to Arrow's inference
+_ARROW_TYPES = {
+    16: pa.bool_(), 20: pa.int64(), 21: pa.int16(), 23: pa.int32(), 26: pa.int64(),
+    700: pa.float32(), 701: pa.float64(), 1700: pa.float64(),
+    18: pa.string(), 19: pa.string(), 25: pa.string(), 1042: pa.string(), 1043: pa.string(),
+    1082: pa.date32(), 1114: pa.timestamp("us"),
+}
+
+
+def _copy_convert_options(desc: Sequence[Any]) -> pa_csv.ConvertOptions:
+    """CSV conversion for ``COPY ... (FORMAT csv)`` output with columns ``desc``.
+
+    Column types come from the cursor description rather than inference,
+    which would turn numeric-looking text (postcodes, IDs) into numbers. As
+    in Postgres CSV, only an unquoted empty field is NULL and ``t``/``f`` are
+    booleans.
+    """
+    types = {d.name: _ARROW_TYPES[d.type_code] for d in desc if d.type_code in _ARROW_TYPES}
+    return pa_csv.ConvertOptions(column_types=types, null_values=[""], strings_can_be_null=True,
+                                 quoted_strings_can_be_null=False, true_values=["t"], false_values=["f"])
+
+
+def read_sql_arrow(sql: str, params: Optional[Iterable[Any]] = None) -> pa.Table:
+    """Execute a SELECT and return the result as a ``pyarrow.Table``.
+
+    The query is streamed with ``COPY (...) TO STDOUT``: a writer thread feeds
+    the CSV into a pipe that Arrow's incremental CSV reader parses block by
+    block, so the result never becomes Python row tuples nor a second full
+    copy in a buffer. A ``LIMIT 0`` run of the query first supplies the column
+    types. Use ``table.to_pandas(types_mapper=pd.ArrowDtype)`` to keep Arrow
+    dtypes.
+    """
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            query = cur.mogrify(sql, params).decode().strip().rstrip(";")
+            cur.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+            options = _copy_convert_options(cur.description)
+            copy_sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+            read_fd, write_fd = os.pipe()
+            errors: list = []
+
+            def write() -> None:
+                try:
+                    with os.fdopen(write_fd, "wb") as out:
+                        cur.copy_expert(copy_sql, out)
+                except BaseException as exc:  # re-raised on the calling thread
+                    errors.append(exc)
+
+            writer = threading.Thread(target=write, name="copy-to-arrow", daemon=True)
+            writer.start()
+            try:
+                # closing the read end first unblocks a writer stuck on a full pipe
+                with os.fdopen(read_fd, "rb") as src:
+                    table = pa_csv.open_csv(src, convert_options=options).read_all()
+            finally:
+                writer.join()
+                # a broken pipe only means the reader stopped early and raised
+                if errors and not isinstance(errors[0], BrokenPipeError):
+                    raise errors[0]
+    return table
+
+
+def fetch_one(conn, sql: str, params: Optional[Any] = None) -> Dict[str, Any]:
+    """Run a single-row query on ``conn`` and return it as ``{column: value}``.
+
+    Skips DataFrame construction for KPI-style aggregates. Returns an empty
+    dict if the query yields no row.
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        row = cur.fetchone()
+        if row is None:
+            return {}
+        return dict(zip((d.name for d in cur.description), row))
+
+
+def read_one(sql: str, params: Optional[Any] = None) -> Dict[str, Any]:
+    """``fetch_one`` on a fresh connection from ``get_conn``."""
     with get_conn() as conn:
-        return pd.read_sql_query(sql, conn, params=params)
+        return fetch_one(conn, sql, params)
@@ -0,0 +1,147 @@
+"""Shared, cached KPI queries reused across Streamlit pages.
+
+Pages import these instead of defining their own ``@st.cache_data``
+functions, so the same (query, filters) pair is cached once for the whole
+app rather than once per page. All queries go through the process-wide
+connection pool in ``db.get_pool`` and the shared result cache in
+``db.cached_frame``.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import psycopg2.errors
+import streamlit as st
+
+from .db import cached_frame, count_distinct_sql, date_key_range, fetch_frame, get_conn, product_join_sql, read_one, read_sql
+
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+
+def _to_server_params(sql: str) -> Tuple[str, int]:
+    """Rewrite psycopg2 ``%s`` placeholders as ``$1..$n`` for ``PREPARE``."""
+    n = 0
+
+    def sub(m: "re.Match[str]") -> str:
+        nonlocal n
+        if m.group(0) == "%%":
+            return "%"
+        n += 1
+        return f"${n}"
+
+    return _PLACEHOLDER.sub(sub, sql), n
+
+
+def read_sql_prepared(key: str, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+    """Run ``sql`` as a server-side prepared statement on a pooled connection.
+
+    The statement is PREPAREd once per connection and then EXECUTEd, so
+    Postgres reuses the parsed plan across reruns. Only positional ``%s``
+    placeholders are supported. The statement name combines ``key`` with a hash
+    of the SQL, so variants built from the same f-string get their own plan.
+    Results share ``db.cached_frame``'s LRU with ``read_sql``.
+    """
+    name = f"{key}_{hashlib.sha1(sql.encode()).hexdigest()[:8]}"
+
+    def load() -> pd.DataFrame:
+        with get_conn() as conn:
+            for attempt in range(2):
+                if name not in conn.prepared:
+                    text, n = _to_server_params(sql)
+                    if n != len(params):
+                        raise ValueError(f"{key}: expected {n} parameters, got {len(params)}")
+                    with conn.cursor() as cur:
+                        cur.execute(f"PREPARE {name} AS {text}")
+                    conn.prepared.add(name)
+                args = ", ".join(["%s"] * len(params))
+                try:
+                    return fetch_frame(conn, f"EXECUTE {name}" + (f" ({args})" if params else ""),
+                                       list(params) or None)
+                except psycopg2.errors.InvalidSqlStatementName:
+                    # statement gone server-side (e.g. session reset): prepare again once
+                    if attempt:
+                        raise
+                    conn.rollback()
+                    conn.prepared.discard(name)
+
+    return cached_frame(sql, list(params), load)
+
+
+@st.cache_data(ttl=300)
+def categories() -> List[str]:
+    """Category options for sidebar filters."""
+    try:
+        df = read_sql("SELECT DISTINCT category FROM products WHERE category IS NOT NULL ORDER BY 1")
+        return df["category"].dropna().tolist()
+    except Exception:
+        return []
+
+
+@st.cache_data(ttl=60)
+def kpi_query(start: str, end: str, cats: Optional[List[str]] = None,
+              prev_start: Optional[str] = None, prev_end: Optional[str] = None) -> Dict[str, Any]:
+    """Revenue, active customers, orders and AOV for a date range.
+
+    If a comparison window is given, its revenue is returned as ``rev_prev``
+    from the same fact scan (``FILTER`` aggregates over both windows).
+    """
+    params: Dict[str, Any] = {"start": start, "end": end, "cats": cats,
+                              "prev_start": prev_start, "prev_end": prev_end}
+    now = "d.date BETWEEN %(start)s AND %(end)s"
+    has_prev = bool(prev_start and prev_end)
+    prev = "d.date BETWEEN %(prev_start)s AND %(prev_end)s"
+    window = f"({now} OR {prev})" if has_prev else now
+    where_cat = "" if not cats else " AND p.category = ANY(%(cats)s)"
+    sql = f"""
+        SELECT
+          SUM(t.revenue) FILTER (WHERE {now}) AS revenue,
+          {count_distinct_sql('t.customer_id', now)} AS active_customers,
+          COUNT(*) FILTER (WHERE {now}) AS orders,
+          SUM(t.revenue) FILTER (WHERE {now}) / NULLIF(COUNT(*) FILTER (WHERE {now}), 0) AS aov,
+          {f"SUM(t.revenue) FILTER (WHERE {prev})" if has_prev else "NULL"} AS rev_prev
+        FROM transactions t
+        {product_join_sql(cats)}
+        LEFT JOIN time_dimension d ON d.date_key = t.date_key
+        WHERE {window}{where_cat}
+    """
+    return read_one(sql, params)
+
+
+@st.cache_data(ttl=300)
+def revenue_by_category(start: str, end: str) -> pd.DataFrame:
+    """Revenue per category (product dimension, falling back to the fact), descending."""
+    sql = """
+      SELECT COALESCE(p.category, t.category, 'Unknown') AS category, SUM(t.revenue) AS revenue
+      FROM transactions t LEFT JOIN products p ON p.product_id = t.product_id
+      WHERE t.date_key BETWEEN %s AND %s
+      GROUP BY 1 ORDER BY 2 DESC
+    """
+    return read_sql(sql, list(date_key_range(start, end)))
+
+
+@st.cache_data(ttl=300)
+def revenue_by_state(start: str, end: str) -> pd.DataFrame:
+    """Revenue per customer state, descending."""
+    sql = """
+      SELECT COALESCE(t.state, 'Unknown') AS state, SUM(t.revenue) AS revenue
+      FROM transactions t
+      WHERE t.date_key BETWEEN %s AND %s
+      GROUP BY 1 ORDER BY 2 DESC
+    """
+    return read_sql(sql, list(date_key_range(start, end)))
+
+
+@st.cache_data(ttl=300)
+def revenue_by_city(start: str, end: str, limit: int = 50) -> pd.DataFrame:
+    """Top ``limit`` customer cities by revenue."""
+    sql = """
+      SELECT COALESCE(t.city, 'Unknown') AS city, SUM(t.revenue) AS revenue
+      FROM transactions t
+      WHERE t.date_key BETWEEN %s AND %s
+      GROUP BY 1 ORDER BY 2 DESC
+      LIMIT %s
+    """
+    return read_sql(sql, [*date_key_range(start, end), limit])
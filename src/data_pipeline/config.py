@@ -1,10 +1,13 @@
 """JSON-backed configuration models for the cleaning pipeline."""
 
+import copy
+import functools
 import json
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass, field, fields
 from typing import Dict, List, Optional, Any
 
-@dataclass
+@dataclass(slots=True)
 class MissingConfig:
     # strategies: "mean" | "median" | "mode" | {"constant": value}
     numeric_strategy: str = "median"
@@ -13,7 +16,7 @@ class MissingConfig:
     include: List[str] = field(default_factory=list)
     exclude: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class DatesConfig:
     fields: List[str] = field(default_factory=list)
     # e.g. "%Y-%m-%d"; see Python datetime strftime directives
@@ -26,7 +29,7 @@ class DatesConfig:
     ])
     invalid_to_null: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class PriceConfig:
     fields: List[str] = field(default_factory=list)
     # normalization options
@@ -34,7 +37,7 @@ class PriceConfig:
     decimal_places: int = 2
     coerce_invalid_to_null: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class CategoricalConfig:
     fields: List[str] = field(default_factory=list)
     lowercase: bool = True
@@ -45,48 +48,48 @@ class CategoricalConfig:
     # mappings example:
     # { "category_field": { "elec.": "electronics", "elec": "electronics" } }
 
-@dataclass
+@dataclass(slots=True)
 class GeoConfig:
     city_field: Optional[str] = None
     canonical_cities: List[str] = field(default_factory=list)
     city_mappings: Dict[str, str] = field(default_factory=dict)
     fuzzy_threshold: float = 0.85  # 0..1 (used by difflib)
 
-@dataclass
+@dataclass(slots=True)
 class RatingsConfig:
     column: Optional[str] = None
     decimal_places: int = 1
     impute_strategy: Any = "median"  # "median" | "mean" | float
 
-@dataclass
+@dataclass(slots=True)
 class BooleansConfig:
     fields: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class DeliveryConfig:
     column: Optional[str] = None
     max_days: int = 30
     clip_max: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class PaymentConfig:
     column: Optional[str] = None
     extra_mappings: Dict[str, str] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class DedupConfig:
     key_fields: List[str] = field(default_factory=list)
     quantity_field: Optional[str] = None
     strategy: str = "keep_first"
 
-@dataclass
+@dataclass(slots=True)
 class OutliersConfig:
     column: Optional[str] = None
     high_factor: float = 50.0
     downscale_candidates: List[int] = field(default_factory=lambda: [10, 100])
     decimal_places: int = 2
 
-@dataclass
+@dataclass(slots=True)
 class PipelineConfig:
     missing: MissingConfig = field(default_factory=MissingConfig)
     dates: DatesConfig = field(default_factory=DatesConfig)
@@ -100,52 +103,29 @@ class PipelineConfig:
     dedup: DedupConfig = field(default_factory=DedupConfig)
     outliers: OutliersConfig = field(default_factory=OutliersConfig)
 
+# PipelineConfig field name -> section dataclass
+_SECTIONS = {f.name: f.default_factory for f in fields(PipelineConfig)}
+
+
+def _from_dict(cls, d: Optional[dict]):
+    """Build a section dataclass from its JSON dict, or defaults if absent/empty."""
+    return cls(**d) if d else cls()
+
+
+@functools.lru_cache(maxsize=16)
+def _load_config_cached(path: str, mtime_ns: int) -> PipelineConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    return PipelineConfig(**{name: _from_dict(cls, cfg.get(name)) for name, cls in _SECTIONS.items()})
+
+
 def load_config(path: str) -> PipelineConfig:
     """Load a pipeline configuration from a JSON file.
 
     Returns a fully-populated ``PipelineConfig`` with sensible defaults for
-    any missing sections.
+    any missing sections. Parsed configs are memoized on (path, mtime), so
+    repeated loads of an unchanged file skip the JSON parse; callers get a
+    deep copy and may modify it freely.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
-
-    def to_missing(d: dict) -> MissingConfig:
-        return MissingConfig(**d) if d else MissingConfig()
-
-    def to_dates(d: dict) -> DatesConfig:
-        return DatesConfig(**d) if d else DatesConfig()
-
-    def to_price(d: dict) -> PriceConfig:
-        return PriceConfig(**d) if d else PriceConfig()
-
-    def to_categorical(d: dict) -> CategoricalConfig:
-        return CategoricalConfig(**d) if d else CategoricalConfig()
-
-    def to_geo(d: dict) -> GeoConfig:
-        return GeoConfig(**d) if d else GeoConfig()
-    def to_ratings(d: dict) -> RatingsConfig:
-        return RatingsConfig(**d) if d else RatingsConfig()
-    def to_booleans(d: dict) -> BooleansConfig:
-        return BooleansConfig(**d) if d else BooleansConfig()
-    def to_delivery(d: dict) -> DeliveryConfig:
-        return DeliveryConfig(**d) if d else DeliveryConfig()
-    def to_payment(d: dict) -> PaymentConfig:
-        return PaymentConfig(**d) if d else PaymentConfig()
-    def to_dedup(d: dict) -> DedupConfig:
-        return DedupConfig(**d) if d else DedupConfig()
-    def to_outliers(d: dict) -> OutliersConfig:
-        return OutliersConfig(**d) if d else OutliersConfig()
-
-    return PipelineConfig(
-        missing=to_missing(cfg.get("missing")),
-        dates=to_dates(cfg.get("dates")),
-        price=to_price(cfg.get("price")),
-        categorical=to_categorical(cfg.get("categorical")),
-        geo=to_geo(cfg.get("geo")),
-        ratings=to_ratings(cfg.get("ratings")),
-        booleans=to_booleans(cfg.get("booleans")),
-        delivery=to_delivery(cfg.get("delivery")),
-        payment=to_payment(cfg.get("payment")),
-        dedup=to_dedup(cfg.get("dedup")),
-        outliers=to_outliers(cfg.get("outliers")),
-    )
+    path = os.path.abspath(path)
+    return copy.deepcopy(_load_config_cached(path, os.stat(path).st_mtime_ns))
@@ -1,32 +1,152 @@
 """Utilities for initializing and populating the Postgres analytics schema."""
 
 import os
-from datetime import date, timedelta
-from typing import Optional
+import re
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 import psycopg2
 from psycopg2.extensions import connection as PGConnection
 
 
 def connect_postgres(dsn: Optional[str] = None) -> PGConnection:
-    """Create a Postgres connection and set ``search_path`` to ``analytics``.
+    """Create a Postgres connection with ``search_path`` set to ``analytics``.
 
     Reads DSN from the parameter or ``POSTGRES_DSN`` environment variable.
+    The search path is a libpq startup option, so no ``SET`` round trip runs.
     """
     dsn = dsn or os.environ.get("POSTGRES_DSN") or "dbname=postgres user=postgres host=localhost password=postgres"
-    conn = psycopg2.connect(dsn)
-    with conn.cursor() as cur:
-        cur.execute("SET search_path = analytics, public;")
-    conn.commit()
-    return conn
+    return psycopg2.connect(dsn, options="-c search_path=analytics,public")
+
+
+_CONN: Optional[PGConnection] = None
+
+
+def get_or_create_connection(dsn: Optional[str] = None) -> PGConnection:
+    """Return the process-wide connection from ``connect_postgres``, reconnecting if closed.
+
+    For scripts that need a connection in several phases of one run; the
+    ``dsn`` only applies when a new connection is opened.
+    """
+    global _CONN
+    if _CONN is None or _CONN.closed:
+        _CONN = connect_postgres(dsn)
+    return _CONN
+
+
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+
+
+def _scan_escape_string(line: str, i: int) -> Optional[int]:
+    """End index (exclusive) of an ``E'...'`` body starting at ``i``, or ``None`` if it continues."""
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if ch == "\\":
+            i += 2
+        elif ch == "'":
+            if line.startswith("''", i):
+                i += 2
+            else:
+                return i + 1
+        else:
+            i += 1
+    return None
+
+
+def _scan_block_comment(line: str, i: int, depth: int) -> Tuple[Optional[int], int]:
+    """Scan a ``/* */`` comment nested ``depth`` deep from ``i``.
+
+    Returns ``(end, depth)``: ``end`` is the index just past the outermost
+    ``*/``, or ``None`` if the comment continues on the next line.
+    """
+    n = len(line)
+    while i < n:
+        if line.startswith("/*", i):
+            depth, i = depth + 1, i + 2
+        elif line.startswith("*/", i):
+            depth, i = depth - 1, i + 2
+            if depth == 0:
+                return i, 0
+        else:
+            i += 1
+    return None, depth
+
+
+def iter_sql_statements(lines: Iterable[str]) -> Iterator[str]:
+    """Split SQL text, given line by line, into statements on top-level ``;``.
+
+    Semicolons inside ``'...'`` literals (``''`` included), ``E'...'`` literals
+    with backslash escapes, ``"..."`` identifiers, ``$tag$...$tag$`` bodies,
+    ``--`` comments and nested ``/* */`` comments do not end a statement.
+    Only the statement being built is held in memory. Not understood: psql
+    meta-commands (``\\copy`` etc.) and the ``standard_conforming_strings = off``
+    setting, under which plain ``'...'`` literals also take backslash escapes.
+    """
+    buf: List[str] = []
+    # open span: "'", "E'", '"', "/*" or a dollar tag; None in plain SQL text
+    span: Optional[str] = None
+    depth = 0  # block comment nesting
+    has_code = False  # comment-only chunks are not statements
+    for line in lines:
+        i = 0
+        while i < len(line):
+            if span == "E'":
+                end = _scan_escape_string(line, i)
+            elif span == "/*":
+                end, depth = _scan_block_comment(line, i, depth)
+            elif span is not None:
+                end = line.find(span, i)
+                end = None if end < 0 else end + len(span)
+            if span is not None:
+                if end is None:
+                    buf.append(line[i:])
+                    break
+                buf.append(line[i:end])
+                i, span = end, None
+                continue
+            ch = line[i]
+            if not (ch.isspace() or ch == ";" or line.startswith(("--", "/*"), i)):
+                has_code = True
+            if ch == "'":
+                # E'...' unless the E ends a longer identifier
+                prefixed = i > 0 and line[i - 1] in "eE" and not (i > 1 and (line[i - 2].isalnum() or line[i - 2] == "_"))
+                span, step = ("E'" if prefixed else "'"), 1
+            elif ch == '"':
+                span, step = '"', 1
+            elif line.startswith("--", i):
+                buf.append(line[i:])
+                break
+            elif line.startswith("/*", i):
+                span, depth, step = "/*", 1, 2
+            elif ch == "$" and (m := _DOLLAR_TAG.match(line, i)):
+                span, step = m.group(0), len(m.group(0))
+            elif ch == ";":
+                if has_code:
+                    yield "".join(buf).strip()
+                buf, has_code = [], False
+                i += 1
+                continue
+            else:
+                step = 1
+            buf.append(line[i:i + step])
+            i += step
+    if has_code:
+        yield "".join(buf).strip()
 
 
 def execute_sql_file(conn: PGConnection, path: str):
-    """Execute a .sql file against an open Postgres connection."""
-    with open(path, "r", encoding="utf-8") as f:
-        sql = f.read()
-    with conn.cursor() as cur:
-        cur.execute(sql)
+    """Execute a .sql file against an open Postgres connection.
+
+    The file is streamed and run one statement at a time via
+    ``iter_sql_statements``, all in one transaction.
+    """
+    with open(path, "r", encoding="utf-8") as f, conn.cursor() as cur:
+        for stmt in iter_sql_statements(f):
+            cur.execute(stmt)
     conn.commit()
 
 
@@ -35,50 +155,108 @@ def yyyymmdd(d: date) -> int:
     return d.year * 10000 + d.month * 100 + d.day
 
 
-def populate_time_dimension_pg(conn: PGConnection, start: date, end: date, fiscal_year_start_month: int = 4):
+@contextmanager
+def deferred_secondary_indexes(conn: PGConnection, table: str) -> Iterator[None]:
+    """Drop ``table``'s non-unique indexes for a bulk load, then rebuild them.
+
+    Each index is recreated from its stored definition in a ``finally`` block,
+    so one sorted build replaces per-row b-tree maintenance. If the load left
+    the transaction aborted, the rollback restores the dropped indexes instead.
+    Primary-key and unique indexes stay in place for ``ON CONFLICT``. The
+    session settings are ``SET LOCAL`` and end with the transaction.
+
+    ``DROP INDEX`` takes an ACCESS EXCLUSIVE lock on ``table`` that is held
+    until the transaction ends, so every reader of the table (dashboards
+    included) blocks for the whole load and rebuild. Use it only for bulk
+    loads, not for small incremental upserts.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT x.indexrelid::regclass::text, pg_get_indexdef(x.indexrelid)
+            FROM pg_index x
+            WHERE x.indrelid = %s::regclass AND NOT x.indisunique AND NOT x.indisprimary
+            """,
+            (table,),
+        )
+        indexes = cur.fetchall()
+        cur.execute("SET LOCAL maintenance_work_mem = '1GB'")
+        cur.execute("SET LOCAL synchronous_commit = OFF")
+        for name, _ in indexes:
+            cur.execute(f"DROP INDEX {name}")
+    try:
+        yield
+    finally:
+        if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            with conn.cursor() as cur:
+                for _, indexdef in indexes:
+                    cur.execute(indexdef)
+
+
+TIME_DIMENSION_COLUMNS = (
+    "date_key", "date", "day", "month", "month_name", "quarter", "quarter_name",
+    "year", "week_iso", "day_name", "is_weekend", "fiscal_year", "fiscal_quarter",
+)
+# Postgres type of each column above, for the UNNEST array casts
+TIME_DIMENSION_TYPES = (
+    "integer", "date", "smallint", "smallint", "text", "smallint", "text",
+    "integer", "smallint", "text", "boolean", "integer", "smallint",
+)
+# Ranges at least this many days long count as a bulk load and rebuild the
+# secondary indexes once afterwards; shorter ones upsert under the normal
+# row locks
+BULK_TIME_DIMENSION_DAYS = 366
+
+
+def populate_time_dimension_pg(conn: PGConnection, start: date, end: date, fiscal_year_start_month: int = 4,
+                               bulk: Optional[bool] = None):
     """Populate or upsert rows in ``time_dimension`` for a date range.
 
     Includes calendar attributes and fiscal year/quarter given a fiscal year
     start month (default April for India).
+
+    With ``bulk`` the secondary indexes are dropped for the load and rebuilt
+    after it (see ``deferred_secondary_indexes``), which locks out readers of
+    ``time_dimension`` until the commit. ``None`` picks bulk mode for ranges of
+    ``BULK_TIME_DIMENSION_DAYS`` or more.
     """
-    rows = []
-    d = start
-    while d <= end:
-        dk = yyyymmdd(d)
-        day = d.day
-        month = d.month
-        year = d.year
-        month_name = d.strftime("%B")
-        quarter = (month - 1) // 3 + 1
-        quarter_name = f"Q{quarter}"
-        week_iso = int(d.strftime("%V"))
-        day_name = d.strftime("%A")
-        is_weekend = d.weekday() >= 5
-        fy = year if month >= fiscal_year_start_month else (year - 1)
-        fquarter = ((month - fiscal_year_start_month) % 12) // 3 + 1
-        rows.append((dk, d, day, month, month_name, quarter, quarter_name, year, week_iso, day_name, is_weekend, fy, fquarter))
-        d += timedelta(days=1)
+    idx = pd.date_range(start, end, freq="D")
+    year = idx.year.to_numpy()
+    month = idx.month.to_numpy()
+    day = idx.day.to_numpy()
+    quarter = (month - 1) // 3 + 1
+    td = pd.DataFrame({
+        "date_key": year * 10000 + month * 100 + day,
+        "date": idx.strftime("%Y-%m-%d"),
+        "day": day,
+        "month": month,
+        "month_name": idx.month_name(),
+        "quarter": quarter,
+        "quarter_name": "Q" + pd.Index(quarter).astype(str),
+        "year": year,
+        "week_iso": idx.isocalendar().week.to_numpy(),
+        "day_name": idx.day_name(),
+        "is_weekend": idx.weekday >= 5,
+        "fiscal_year": np.where(month >= fiscal_year_start_month, year, year - 1),
+        "fiscal_quarter": ((month - fiscal_year_start_month) % 12) // 3 + 1,
+    }, columns=TIME_DIMENSION_COLUMNS)
 
-    with conn.cursor() as cur:
-        cur.executemany(
-            """
-            INSERT INTO time_dimension
-            (date_key, date, day, month, month_name, quarter, quarter_name, year, week_iso, day_name, is_weekend, fiscal_year, fiscal_quarter)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    # One statement: each column travels as a single array parameter and
+    # UNNEST expands them back into rows server-side
+    cols = ", ".join(TIME_DIMENSION_COLUMNS)
+    arrays = ", ".join(f"%s::{t}[]" for t in TIME_DIMENSION_TYPES)
+    updates = ",\n              ".join(f"{c} = EXCLUDED.{c}" for c in TIME_DIMENSION_COLUMNS[1:])
+    if bulk is None:
+        bulk = len(idx) >= BULK_TIME_DIMENSION_DAYS
+    indexes = deferred_secondary_indexes(conn, "time_dimension") if bulk else nullcontext()
+    with indexes, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            INSERT INTO time_dimension ({cols})
+            SELECT * FROM UNNEST({arrays}) AS t({cols})
             ON CONFLICT (date_key) DO UPDATE SET
-              date = EXCLUDED.date,
-              day = EXCLUDED.day,
-              month = EXCLUDED.month,
-              month_name = EXCLUDED.month_name,
-              quarter = EXCLUDED.quarter,
-              quarter_name = EXCLUDED.quarter_name,
-              year = EXCLUDED.year,
-              week_iso = EXCLUDED.week_iso,
-              day_name = EXCLUDED.day_name,
-              is_weekend = EXCLUDED.is_weekend,
-              fiscal_year = EXCLUDED.fiscal_year,
-              fiscal_quarter = EXCLUDED.fiscal_quarter
+              {updates}
             """,
-            rows,
+            [td[c].tolist() for c in TIME_DIMENSION_COLUMNS],
         )
     conn.commit()
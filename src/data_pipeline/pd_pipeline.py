@@ -9,11 +9,13 @@ cleaned DataFrame along with a step-by-step report.
 
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 import math
 import difflib
 import unicodedata
 import re
+import numpy as np
 import pandas as pd
 from .config import PipelineConfig
 
@@ -38,6 +40,34 @@ def dq_report_df(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
+def _to_arrow_string(s: pd.Series) -> pd.Series:
+    """``s`` as ``string[pyarrow]`` so ``.str`` methods run on Arrow kernels."""
+    if isinstance(s.dtype, pd.StringDtype) and s.dtype.storage == "pyarrow":
+        return s
+    return s.astype("string[pyarrow]")
+
+
+def _diff_count(a: pd.Series, b: pd.Series) -> int:
+    """Number of positions where ``a`` and ``b`` differ, on the raw arrays.
+
+    Missing on both sides counts as unchanged and missing on one side as
+    changed, whatever the two dtypes are; no masked pandas result is built.
+    """
+    va = a.to_numpy(dtype=object)
+    vb = b.to_numpy(dtype=object)
+    na_a, na_b = pd.isna(va), pd.isna(vb)
+    both = ~(na_a | na_b)
+    return int((na_a != na_b).sum() + (va[both] != vb[both]).sum())
+
+
+def _plain_values(s: pd.Series) -> pd.Series:
+    """``s`` with a Categorical decoded to object values, so a step can write
+    labels that are not among its categories; other dtypes pass through."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.astype(object)
+    return s
+
+
 # ---------- Cleaning steps (pandas) ----------
 
 def impute_missing_pd(df: pd.DataFrame, cfg: PipelineConfig) -> Tuple[pd.DataFrame, Dict[str, Any]]:
@@ -76,6 +106,16 @@ def impute_missing_pd(df: pd.DataFrame, cfg: PipelineConfig) -> Tuple[pd.DataFra
     return df, rep
 
 
+def _strftime_unique(parsed: pd.Series, fmt: str) -> pd.Series:
+    """``parsed.dt.strftime(fmt)``, formatting each distinct timestamp only once."""
+    codes, uniques = pd.factorize(parsed, sort=False)
+    formatted = pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object)
+    out = np.full(len(codes), np.nan, dtype=object)
+    ok = codes >= 0
+    out[ok] = formatted[codes[ok]]
+    return pd.Series(out, index=parsed.index, name=parsed.name)
+
+
 def standardize_dates_pd(df: pd.DataFrame, fields: List[str], invalid_to_null: bool, target_format: str,
                          input_formats: List[str]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Parse and normalize date columns to a target string format.
@@ -87,7 +127,7 @@ def standardize_dates_pd(df: pd.DataFrame, fields: List[str], invalid_to_null: b
     for f in fields:
         if f not in df.columns:
             continue
-        ser = df[f].astype("string")
+        ser = _to_arrow_string(df[f])
         # first pass: parse unambiguous/ISO without dayfirst to avoid warnings
         parsed = pd.to_datetime(ser, errors="coerce")
         # secondary passes for explicit formats
@@ -96,19 +136,25 @@ def standardize_dates_pd(df: pd.DataFrame, fields: List[str], invalid_to_null: b
             if rem.empty:
                 break
             parsed2 = pd.to_datetime(rem, errors="coerce", format=fmt)
-            parsed.loc[parsed.isna()] = parsed2
-        
+            parsed = parsed.fillna(parsed2)
+
         before_nonnull = ser.notna() & (ser.str.len() > 0)
         changed[f] = int((parsed.notna() & before_nonnull).sum())
+        formatted = _strftime_unique(parsed, target_format)
         if invalid_to_null:
-            df.loc[:, f] = parsed.dt.strftime(target_format)
+            df[f] = formatted
         else:
             # keep original where parsing failed
-            df.loc[:, f] = df[f].where(parsed.isna(), parsed.dt.strftime(target_format))
+            df[f] = _plain_values(df[f]).where(parsed.isna(), formatted)
     return df, {"dates_converted": changed}
 
 
-_CURRENCY_RE = re.compile(r"[^\d\-\.\,()]")
+# Everything but digits, sign, decimal point and parentheses (drops currency
+# symbols, spaces and thousands separators); a plain string so it runs as one
+# Arrow regex kernel
+_CURRENCY_STRIP = r"[^\d\-.()]"
+# parentheses mean negative: "(12.50)" -> "-12.50"
+_PAREN_NEG = r"^\((.*)\)$"
 
 def standardize_prices_pd(df: pd.DataFrame, fields: List[str], decimal_places: int,
                           coerce_invalid_to_null: bool) -> Tuple[pd.DataFrame, Dict[str, Any]]:
@@ -117,16 +163,16 @@ def standardize_prices_pd(df: pd.DataFrame, fields: List[str], decimal_places: i
     for f in fields:
         if f not in df.columns:
             continue
-        s = df[f].astype("string")
-        s2 = s.str.replace(_CURRENCY_RE, "", regex=True).str.replace(",", "", regex=False) # type: ignore
-        # handle parentheses negative
-        neg_mask = s2.str.match(r"^\(.*\)$", na=False)
-        s2 = s2.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+        s = _to_arrow_string(df[f])
+        if not s.notna().any():
+            continue
+        s2 = s.str.replace(_CURRENCY_STRIP, "", regex=True)
+        s2 = s2.str.replace(_PAREN_NEG, r"-\1", regex=True)
         nums = pd.to_numeric(s2, errors="coerce")
         if not coerce_invalid_to_null:
-            df.loc[:, f] = df[f].where(nums.isna(), nums.round(decimal_places))
+            df[f] = _plain_values(df[f]).where(nums.isna(), nums.round(decimal_places))
         else:
-            df.loc[:, f] = nums.round(decimal_places)
+            df[f] = nums.round(decimal_places)
         rep[f] = int(nums.notna().sum())
     return df, {"prices_standardized": rep}
 
@@ -166,12 +212,40 @@ def _parse_rating_val(s: Optional[str], scale_max: float = 5.0) -> Optional[floa
     return None
 
 
+# Plain number | "N star(s)" | "N/M" on the stripped value; ASCII digits only,
+# other Unicode digits are left to the scalar fallback
+_RATING_RE = re.compile(
+    r"^(?:([0-9]+(?:\.[0-9]+)?)|([0-9]+(?:\.[0-9]+)?)\s*stars?|([0-9]+(?:\.[0-9]+)?)\s*/\s*([0-9]+(?:\.[0-9]+)?))$",
+    re.IGNORECASE,
+)
+
+def _parse_ratings(s: pd.Series, scale_max: float = 5.0) -> pd.Series:
+    """Vectorized ``_parse_rating_val`` over a string Series (float64, NaN if unparseable).
+
+    The common forms are extracted with one regex and computed column-wise;
+    anything else that is non-empty (e.g. "1e1", "+4") falls back to
+    ``_parse_rating_val`` once per distinct value.
+    """
+    t = s.str.strip()
+    g = t.str.extract(_RATING_RE).astype("float64")
+    plain, stars, num, den = (g[i] for i in range(4))
+    out = plain.where(plain > 0).clip(1.0, scale_max)
+    out = out.fillna(stars.clip(1.0, scale_max))
+    out = out.fillna((num / den * scale_max).where(den > 0).clip(1.0, scale_max))
+    rest = t[g.isna().all(axis=1) & t.notna() & (t != "")]
+    if not rest.empty:
+        uniq = rest.unique()
+        fallback = dict(zip(uniq, (_parse_rating_val(v, scale_max) for v in uniq)))
+        out.loc[rest.index] = rest.map(fallback).astype("float64")
+    return out
+
+
 def standardize_ratings_pd(df: pd.DataFrame, column: str, decimal_places: int, impute: Any) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Normalize a ratings column to a bounded numeric scale with imputation."""
     if column not in df.columns:
         return df, {"ratings_changed": 0, "ratings_imputed": 0}
-    s = df[column].astype("string")
-    parsed = s.apply(lambda x: _parse_rating_val(x))
+    s = _to_arrow_string(df[column])
+    parsed = _parse_ratings(s)
     changed = int(parsed.notna().sum())
     if isinstance(impute, (int, float)):
         fill_val = float(impute)
@@ -180,11 +254,26 @@ def standardize_ratings_pd(df: pd.DataFrame, column: str, decimal_places: int, i
     else:
         fill_val = parsed.median()
     parsed = parsed.fillna(fill_val)
-    df.loc[:, column] = parsed.round(decimal_places)
+    df[column] = parsed.round(decimal_places)
     imputed = int(df[column].isna().sum()) if pd.isna(fill_val) else int(s.isna().sum())
     return df, {"ratings_changed": changed, "ratings_imputed": imputed}
 
 
+def _recode_categories(s: pd.Series, labels: pd.Series) -> pd.Series:
+    """Relabel categorical ``s`` with ``labels`` (one per category), merging labels that collide."""
+    mapped = pd.Index(labels)
+    categories = mapped.unique().sort_values()
+    remap = categories.get_indexer(mapped)
+    codes = s.cat.codes.to_numpy().copy()
+    ok = codes >= 0
+    codes[ok] = remap[codes[ok]]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=s.index, name=s.name)
+
+
+# compiled, so pandas runs it with Python's Unicode-aware \s (NBSP, \v, ...)
+# rather than Arrow's ASCII-only RE2 class
+_SPACES_RE = re.compile(r"\s+")
+
 def standardize_categories_pd(df: pd.DataFrame, fields: List[str], lowercase: bool, strip: bool,
                               collapse_spaces: bool, replace_ampersand: bool,
                               mappings: Dict[str, Dict[str, str]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
@@ -193,20 +282,24 @@ def standardize_categories_pd(df: pd.DataFrame, fields: List[str], lowercase: bo
     for f in fields:
         if f not in df.columns:
             continue
-        s = df[f].astype("string")
+        # Categorical first: the string ops and mappings then run once per
+        # distinct label, and downstream dedup/groupby work on integer codes
+        s = df[f].astype("category")
+        labels = _to_arrow_string(s.cat.categories.to_series(index=None))
         if strip:
-            s = s.str.strip()
+            labels = labels.str.strip()
         if lowercase:
-            s = s.str.lower()
+            labels = labels.str.lower()
         if replace_ampersand:
-            s = s.str.replace("&", "and", regex=False)
+            labels = labels.str.replace("&", "and", regex=False)
         if collapse_spaces:
-            s = s.str.replace(r"\s+", " ", regex=True)
+            labels = labels.str.replace(_SPACES_RE, " ", regex=True)
         fmap = mappings.get(f, {})
         if fmap:
-            s = s.map(lambda x: fmap.get(x, x))
-        rep[f] = int((df[f] != s).fillna(False).sum())
-        df.loc[:, f] = s
+            labels = labels.replace(fmap)
+        s = _recode_categories(s, labels)
+        rep[f] = _diff_count(df[f], s)
+        df[f] = s
     return df, {"categories_standardized": rep}
 
 
@@ -223,85 +316,99 @@ def resolve_cities_pd(df: pd.DataFrame, column: Optional[str], canonical: List[s
         return df, {"geo_resolved": 0}
     canon_norm = { _normalize_city_name(c): c for c in canonical }
     canon_keys = list(canon_norm.keys())
-    resolved = 0
 
-    def fix(x: Any) -> Any:
-        nonlocal resolved
+    # Resolve each distinct value once, then broadcast back to the rows
+    col = df[column]
+    res: Dict[Any, Any] = {}
+    fuzzy: Dict[str, Optional[str]] = {}
+    for x in pd.unique(col.to_numpy(dtype=object)):
         if x is None or (isinstance(x, float) and math.isnan(x)):
-            return x
+            continue
         raw = str(x)
         if raw in mappings:
-            resolved += 1
-            return mappings[raw]
+            res[x] = mappings[raw]
+            continue
         norm = _normalize_city_name(raw)
         if norm in canon_norm:
-            resolved += 1
-            return canon_norm[norm]
-        if canon_keys:
-            m = difflib.get_close_matches(norm, canon_keys, n=1, cutoff=fuzzy_threshold)
-            if m:
-                resolved += 1
-                return canon_norm[m[0]]
-        return x
-
-    df.loc[:, column] = df[column].apply(fix)
-    return df, {"geo_resolved": resolved}
+            res[x] = canon_norm[norm]
+        elif canon_keys:
+            # spellings that normalize alike share one difflib scan
+            if norm not in fuzzy:
+                m = difflib.get_close_matches(norm, canon_keys, n=1, cutoff=fuzzy_threshold)
+                fuzzy[norm] = canon_norm[m[0]] if m else None
+            if fuzzy[norm] is not None:
+                res[x] = fuzzy[norm]
+
+    hit = col.isin(list(res))
+    if isinstance(col.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(col.cat.categories):
+        # already Categorical (e.g. also a categorical field): relabel the
+        # categories, merging any that resolve to the same city
+        labels = pd.Series([res.get(c, c) for c in col.cat.categories], dtype=col.cat.categories.dtype)
+        df[column] = _recode_categories(col, labels)
+    else:
+        col = _plain_values(col)
+        df[column] = col.where(~hit, col.map(res))
+    return df, {"geo_resolved": int(hit.sum())}
 
 
 _TRUE_SET = {"true", "t", "yes", "y", "1"}
 _FALSE_SET = {"false", "f", "no", "n", "0"}
 
+_BOOL_LOOKUP = {**{k: True for k in _TRUE_SET}, **{k: False for k in _FALSE_SET}}
+
 def standardize_booleans_pd(df: pd.DataFrame, fields: List[str]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Convert mixed boolean-like values (Yes/No, 1/0, Y/N) to True/False."""
     rep = {f: 0 for f in fields if f in df.columns}
     for f in fields:
         if f not in df.columns:
             continue
-        def pb(v: Any) -> Optional[bool]:
-            if pd.isna(v):
-                return None
-            if isinstance(v, bool):
-                return v
-            s = str(v).strip().lower()
-            if s in _TRUE_SET:
-                return True
-            if s in _FALSE_SET:
-                return False
-            return None
-        new = df[f].apply(pb)
-        rep[f] = int((new != df[f]).fillna(False).sum())
-        df.loc[:, f] = new
+        col = df[f]
+        if pd.api.types.is_bool_dtype(col):
+            continue
+        # str/strip/lower + lookup once per distinct value, then map the rows;
+        # real bools pass through, anything unrecognized becomes None
+        lookup = {
+            v: (v if isinstance(v, bool) else _BOOL_LOOKUP.get(str(v).strip().lower()))
+            for v in pd.unique(col.dropna().to_numpy(dtype=object))
+        }
+        new = col.map(lookup).astype(object).where(col.notna(), None).infer_objects()
+        rep[f] = _diff_count(new, col)
+        df[f] = new
     return df, {"booleans_standardized": rep}
 
 
 _RANGE_RE = re.compile(r"^(\d+)\s*[-–]\s*(\d+)")
 _NUM_RE = re.compile(r"^(\d+)")
 
+def _parse_delivery_val(v: Any) -> Optional[int]:
+    """Parse one delivery SLA value ("3", "2-4 days", "same day") to days."""
+    s = str(v).strip().lower()
+    if s in {"same day", "sameday"}:
+        return 0
+    m = _RANGE_RE.match(s)
+    if m:
+        lo = int(m.group(1)); hi = int(m.group(2))
+        return max(lo, hi)
+    m = _NUM_RE.match(s)
+    if m:
+        return int(m.group(1))
+    return None
+
+
 def standardize_delivery_pd(df: pd.DataFrame, column: Optional[str], max_days: int, clip_max: bool) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Parse delivery SLA text/ranges to integer days and clamp outliers."""
     if not column or column not in df.columns:
         return df, {"delivery_changed": 0, "delivery_nullified": 0}
-    def parse(v: Any) -> Optional[int]:
-        if pd.isna(v):
-            return None
-        s = str(v).strip().lower()
-        if s in {"same day", "sameday"}:
-            return 0
-        m = _RANGE_RE.match(s)
-        if m:
-            lo = int(m.group(1)); hi = int(m.group(2))
-            return max(lo, hi)
-        m = _NUM_RE.match(s)
-        if m:
-            return int(m.group(1))
-        return None
-    parsed = df[column].apply(parse)
+    col = df[column]
+    # few distinct SLA values: parse each once and map the rows
+    lookup = {v: _parse_delivery_val(v) for v in pd.unique(col.dropna().to_numpy(dtype=object))}
+    parsed = col.map(lookup).astype(object).where(col.notna(), None).infer_objects()
     nullified = int(((parsed.isna()) | (parsed < 0)).sum())
     parsed = parsed.mask((parsed < 0), other=pd.NA)
     if clip_max:
         parsed = parsed.clip(upper=max_days)
-    changed = int((parsed != df[column]).fillna(False).sum())
-    df.loc[:, column] = parsed
+    changed = _diff_count(parsed, df[column])
+    df[column] = parsed
     return df, {"delivery_changed": changed, "delivery_nullified": nullified}
 
 
@@ -318,7 +425,7 @@ def deduplicate_pd(df: pd.DataFrame, key_fields: List[str], quantity_field: Opti
     if not existing_keys:
         return df, {"dropped": 0, "kept": int(len(df)), "skipped_missing_keys": missing_keys}
     if strategy == "aggregate" and quantity_field and quantity_field in df.columns:
-        grouped = df.groupby(existing_keys, dropna=False, as_index=False)
+        grouped = df.groupby(existing_keys, dropna=False, as_index=False, observed=True)
         # sum quantity if numeric, else first
         aggs = {c: "first" for c in df.columns if c not in existing_keys}
         aggs[quantity_field] = "sum"
@@ -337,91 +444,137 @@ def correct_outliers_pd(df: pd.DataFrame, column: Optional[str], high_factor: fl
         return df, {"corrected": 0, "flagged": 0}
     ser = pd.to_numeric(df[column], errors="coerce")
     med = ser.median()
-    flagged_mask = ser > (med * high_factor)
+    flagged = (ser > (med * high_factor)).to_numpy(dtype=bool, na_value=False)
     corrected = 0
-    for f in downscale_candidates:
-        cand = ser / f
-        ok = flagged_mask & cand.between(med / 10, med * 10)
-        ser = ser.where(~ok, cand)
-        corrected += int(ok.sum())
-        flagged_mask = flagged_mask & ~ok
-    df.loc[:, column] = ser.round(decimal_places)
-    return df, {"corrected": corrected, "flagged": int(flagged_mask.sum()), "median": med}
+    if downscale_candidates and flagged.any():
+        # every candidate division at once; each flagged row takes the first
+        # factor that lands it within 10x of the median
+        vals = ser.to_numpy(dtype=np.float64, na_value=np.nan)
+        cands = vals[:, None] / np.asarray(downscale_candidates, dtype=np.float64)[None, :]
+        ok = flagged[:, None] & (cands >= med / 10) & (cands <= med * 10)
+        fixed = ok.any(axis=1)
+        if fixed.any():
+            picked = cands[np.arange(len(vals)), ok.argmax(axis=1)]
+            ser = ser.mask(pd.Series(fixed, index=ser.index), pd.Series(picked, index=ser.index))
+            corrected = int(fixed.sum())
+            flagged &= ~fixed
+    df[column] = ser.round(decimal_places)
+    return df, {"corrected": corrected, "flagged": int(flagged.sum()), "median": med}
+
+
+def _normalize_payment_val(raw: str, extra_mappings: Dict[str, str]) -> str:
+    """Canonical label for one payment method string, or ``raw`` if unrecognized."""
+    if raw in extra_mappings:
+        return extra_mappings[raw]
+    t = raw.strip().lower().replace("_", " ")
+    t = t.replace("c.o.d", "cod").replace("creditcard", "credit card")
+    if any(x in t for x in ["upi", "phonepe", "google pay", "gpay", "googlepay"]):
+        return "UPI"
+    if any(x in t for x in ["cod", "cash on delivery", "cash-on-delivery"]):
+        return "Cash on Delivery"
+    if "debit" in t:
+        return "Debit Card"
+    if any(x in t for x in ["credit card", "cc"]):
+        return "Credit Card"
+    if "netbank" in t or "net bank" in t:
+        return "Net Banking"
+    if "wallet" in t:
+        return "Wallet"
+    return raw
 
 
 def normalize_payment_pd(df: pd.DataFrame, column: Optional[str], extra_mappings: Dict[str, str]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Map payment method variants (UPI/PhonePe/GPay, CC/CREDIT_CARD, COD) to canonical labels."""
     if not column or column not in df.columns:
         return df, {"payment_standardized": 0}
-    def norm(s: Any) -> Any:
-        if pd.isna(s):
-            return s
-        raw = str(s)
-        if raw in extra_mappings:
-            return extra_mappings[raw]
-        t = raw.strip().lower().replace("_", " ")
-        t = t.replace("c.o.d", "cod").replace("creditcard", "credit card")
-        if any(x in t for x in ["upi", "phonepe", "google pay", "gpay", "googlepay"]):
-            return "UPI"
-        if any(x in t for x in ["cod", "cash on delivery", "cash-on-delivery"]):
-            return "Cash on Delivery"
-        if "debit" in t:
-            return "Debit Card"
-        if any(x in t for x in ["credit card", "cc"]):
-            return "Credit Card"
-        if "netbank" in t or "net bank" in t:
-            return "Net Banking"
-        if "wallet" in t:
-            return "Wallet"
-        return raw
-    new = df[column].apply(norm)
-    changed = int((new != df[column]).fillna(False).sum())
-    df.loc[:, column] = new
+    col = df[column]
+    # one lookup per distinct payment string, then a dict map over the rows
+    lookup = {v: _normalize_payment_val(str(v), extra_mappings)
+              for v in pd.unique(col.dropna().to_numpy(dtype=object))}
+    new = col.map(lookup).astype(object).where(col.notna(), col).infer_objects()
+    changed = _diff_count(new, col)
+    df[column] = new
     return df, {"payment_standardized": changed}
 
 
-def run_cleaning_df(df: pd.DataFrame, cfg: PipelineConfig) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    """Run all configured cleaning steps and collect a step-by-step report."""
-    # Work on a copy to avoid SettingWithCopy issues from upstream slices
-    df = df.copy()
-    report: Dict[str, Any] = {}
-
-    # 1) Missing
-    df, rep = impute_missing_pd(df, cfg)
-    report["missing"] = rep
+_ColumnStep = Tuple[str, List[str], Callable[[pd.DataFrame], Tuple[pd.DataFrame, Dict[str, Any]]]]
 
-    # 2) Dates
-    df, rep = standardize_dates_pd(df, cfg.dates.fields, cfg.dates.invalid_to_null, cfg.dates.target_format, cfg.dates.input_formats)
-    report["dates"] = rep
 
-    # 3) Prices
-    df, rep = standardize_prices_pd(df, cfg.price.fields, cfg.price.decimal_places, cfg.price.coerce_invalid_to_null)
-    report["price"] = rep
+def _column_steps(cfg: PipelineConfig) -> List[_ColumnStep]:
+    """The configured steps that only read and write their own columns, in run order.
 
-    # 4) Ratings
+    Each entry is ``(report key, columns, step)``, where ``step`` takes and
+    returns a frame like the ``*_pd`` functions.
+    """
+    steps: List[_ColumnStep] = [
+        ("dates", list(cfg.dates.fields), lambda d: standardize_dates_pd(
+            d, cfg.dates.fields, cfg.dates.invalid_to_null, cfg.dates.target_format, cfg.dates.input_formats)),
+        ("price", list(cfg.price.fields), lambda d: standardize_prices_pd(
+            d, cfg.price.fields, cfg.price.decimal_places, cfg.price.coerce_invalid_to_null)),
+    ]
     if cfg.ratings.column:
-        df, rep = standardize_ratings_pd(df, cfg.ratings.column, cfg.ratings.decimal_places, cfg.ratings.impute_strategy)
-        report["ratings"] = rep
+        steps.append(("ratings", [cfg.ratings.column], lambda d: standardize_ratings_pd(
+            d, cfg.ratings.column, cfg.ratings.decimal_places, cfg.ratings.impute_strategy)))
+    steps.append(("categorical", list(cfg.categorical.fields), lambda d: standardize_categories_pd(
+        d, cfg.categorical.fields, cfg.categorical.lowercase, cfg.categorical.strip,
+        cfg.categorical.collapse_spaces, cfg.categorical.replace_ampersand, cfg.categorical.mappings)))
+    steps.append(("geo", [cfg.geo.city_field] if cfg.geo.city_field else [], lambda d: resolve_cities_pd(
+        d, cfg.geo.city_field, cfg.geo.canonical_cities, cfg.geo.city_mappings, cfg.geo.fuzzy_threshold)))
+    if cfg.booleans.fields:
+        steps.append(("booleans", list(cfg.booleans.fields), lambda d: standardize_booleans_pd(d, cfg.booleans.fields)))
+    if cfg.delivery.column:
+        steps.append(("delivery", [cfg.delivery.column], lambda d: standardize_delivery_pd(
+            d, cfg.delivery.column, cfg.delivery.max_days, cfg.delivery.clip_max)))
+    return steps
 
-    # 5) Categories
-    df, rep = standardize_categories_pd(df, cfg.categorical.fields, cfg.categorical.lowercase, cfg.categorical.strip,
-                                        cfg.categorical.collapse_spaces, cfg.categorical.replace_ampersand,
-                                        cfg.categorical.mappings)
-    report["categorical"] = rep
 
-    # 6) Geo
-    df, rep = resolve_cities_pd(df, cfg.geo.city_field, cfg.geo.canonical_cities, cfg.geo.city_mappings, cfg.geo.fuzzy_threshold)
-    report["geo"] = rep
+def _run_column_steps(df: pd.DataFrame, steps: List[_ColumnStep], report: Dict[str, Any],
+                      workers: int) -> pd.DataFrame:
+    """Run ``steps`` on ``df`` and record each report under its key, in step order.
 
-    # 7) Booleans
-    if cfg.booleans.fields:
-        df, rep = standardize_booleans_pd(df, cfg.booleans.fields)
-        report["booleans"] = rep
+    With ``workers > 1`` and no column claimed by two steps, each step gets its
+    own shallow sub-frame of its columns in a thread pool (the Arrow string kernels
+    and NumPy release the GIL), and the results are written back. Otherwise the
+    steps run one after another on the whole frame.
+    """
+    present = [[c for c in dict.fromkeys(cols) if c in df.columns] for _, cols, _ in steps]
+    claimed = [c for cols in present for c in cols]
+    if workers <= 1 or len(steps) < 2 or len(claimed) != len(set(claimed)):
+        for key, _, step in steps:
+            df, report[key] = step(df)
+        return df
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(step, df[cols].copy(deep=False)) for (_, _, step), cols in zip(steps, present)]
+        results = [f.result() for f in futures]
+    for (key, _, _), cols, (sub, rep) in zip(steps, present, results):
+        for c in cols:
+            df[c] = sub[c]
+        report[key] = rep
+    return df
+
+
+def run_cleaning_df(df: pd.DataFrame, cfg: PipelineConfig, copy: bool = True,
+                    workers: int = 1) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Run all configured cleaning steps and collect a step-by-step report.
+
+    Steps replace whole columns of the frame they are given. Pass
+    ``copy=False`` when the caller owns ``df`` and no longer needs the raw
+    values, to skip the up-front copy. With ``workers > 1`` the per-column
+    steps (dates through delivery) run in a thread pool when their columns do
+    not overlap; see ``_run_column_steps``.
+    """
+    # Work on a copy to avoid SettingWithCopy issues from upstream slices
+    if copy:
+        df = df.copy()
+    report: Dict[str, Any] = {}
 
-    # 8) Delivery
-    if cfg.delivery.column:
-        df, rep = standardize_delivery_pd(df, cfg.delivery.column, cfg.delivery.max_days, cfg.delivery.clip_max)
-        report["delivery"] = rep
+    # 1) Missing
+    df, rep = impute_missing_pd(df, cfg)
+    report["missing"] = rep
+
+    # 2-8) Per-column steps: dates, prices, ratings, categories, geo, booleans, delivery
+    df = _run_column_steps(df, _column_steps(cfg), report, workers)
 
     # 9) Dedup
     if cfg.dedup.key_fields:
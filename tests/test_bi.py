@@ -0,0 +1,120 @@
+import datetime as dt
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from data_pipeline.bi import db
+from data_pipeline.bi.charts import m4_downsample
+from data_pipeline.bi.queries import _to_server_params
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("select 1", ("select 1", 0)),
+    ("select %s", ("select $1", 1)),
+    ("where a = %s and b between %s and %s", ("where a = $1 and b between $2 and $3", 3)),
+    ("where name like 'x%%' and id = %s", ("where name like 'x%' and id = $1", 1)),
+    ("select 100%%%s", ("select 100%$1", 1)),
+])
+def test_to_server_params(sql, expected):
+    assert _to_server_params(sql) == expected
+
+
+def test_m4_small_frames_pass_through():
+    df = pd.DataFrame({"y": np.arange(10.0)})
+    assert m4_downsample(df, "y", max_points=40) is df
+
+
+def test_m4_keeps_bucket_envelope():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_000)
+    y[1234], y[8765] = 50.0, -50.0
+    df = pd.DataFrame({"y": y})
+    out = m4_downsample(df, "y", max_points=400)
+    assert len(out) <= 400
+    assert out.index.is_monotonic_increasing and out.index.is_unique
+    assert {0, len(df) - 1, 1234, 8765} <= set(out.index)
+    buckets = np.arange(len(df)) * 100 // len(df)
+    for b in (0, 37, 99):
+        rows = df[buckets == b]["y"]
+        kept = out["y"][buckets[out.index] == b]
+        assert kept.max() == rows.max() and kept.min() == rows.min()
+
+
+def test_m4_tolerates_missing_values():
+    df = pd.DataFrame({"y": [np.nan] * 50 + list(range(50))})
+    out = m4_downsample(df, "y", max_points=8)
+    assert 0 < len(out) <= 8
+
+
+class _Column:
+    def __init__(self, name, type_code):
+        self.name, self.type_code = name, type_code
+
+
+class FakeCopyCursor:
+    """Serves a fixed COPY CSV body; ``description`` is set by ``execute``."""
+
+    def __init__(self, desc, body, fail=None):
+        self.desc, self.body, self.fail = desc, body, fail
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, sql, params):
+        return sql.encode()
+
+    def execute(self, sql, params=None):
+        self.description = self.desc
+
+    def copy_expert(self, sql, out):
+        assert sql.startswith("COPY (") and sql.endswith("TO STDOUT WITH (FORMAT csv, HEADER)")
+        # written in small pieces so the reader sees a real stream
+        for i in range(0, len(self.body), 7):
+            out.write(self.body[i:i + 7])
+        if self.fail:
+            raise self.fail
+
+
+def _serve(monkeypatch, cursor):
+    class Conn:
+        def cursor(self):
+            return cursor
+
+    @contextmanager
+    def get_conn():
+        yield Conn()
+
+    monkeypatch.setattr(db, "get_conn", get_conn)
+
+
+def test_read_sql_arrow_types_from_description(monkeypatch):
+    desc = [_Column("zip", 25), _Column("n", 23), _Column("rev", 1700), _Column("ok", 16),
+            _Column("day", 1082), _Column("note", 25)]
+    rows = "00123,1,10.50,t,2015-01-25,\"\"\n" "45,,,f,,\n"
+    body = ("zip,n,rev,ok,day,note\n" + rows * 3000).encode()
+    _serve(monkeypatch, FakeCopyCursor(desc, body))
+    table = db.read_sql_arrow("select 1;")
+    assert table.schema.types == [pa.string(), pa.int32(), pa.float64(), pa.bool_(), pa.date32(), pa.string()]
+    assert table.num_rows == 6000
+    head = table.slice(0, 2).to_pylist()
+    assert head[0] == {"zip": "00123", "n": 1, "rev": 10.5, "ok": True, "day": dt.date(2015, 1, 25), "note": ""}
+    assert head[1] == {"zip": "45", "n": None, "rev": None, "ok": False, "day": None, "note": None}
+
+
+def test_read_sql_arrow_empty_result_keeps_types(monkeypatch):
+    _serve(monkeypatch, FakeCopyCursor([_Column("x", 701)], b"x\n"))
+    table = db.read_sql_arrow("select 1")
+    assert table.num_rows == 0 and table.schema.types == [pa.float64()]
+
+
+def test_read_sql_arrow_raises_copy_errors(monkeypatch):
+    _serve(monkeypatch, FakeCopyCursor([_Column("x", 23)], b"x\n1\n", fail=RuntimeError("server gone")))
+    with pytest.raises(RuntimeError, match="server gone"):
+        db.read_sql_arrow("select 1")
@@ -0,0 +1,111 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from data_pipeline.db_pg_utils import iter_sql_statements, populate_time_dimension_pg
+
+
+def split(sql: str):
+    return list(iter_sql_statements(sql.splitlines(keepends=True)))
+
+
+def test_splits_on_top_level_semicolons():
+    assert split("select 1; select 2;\nselect 3") == ["select 1", "select 2", "select 3"]
+
+
+def test_skips_empty_and_comment_only_chunks():
+    assert split(";; -- only a comment;\n/* and ; this */;\nselect 1;") == ["select 1"]
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("select 'a;b'; select 2", ["select 'a;b'", "select 2"]),
+    ("select 'it''s; fine'; select 2", ["select 'it''s; fine'", "select 2"]),
+    ("select 'two\nlines;'; select 2", ["select 'two\nlines;'", "select 2"]),
+    ('select "odd;name" from t; select 2', ['select "odd;name" from t', "select 2"]),
+])
+def test_quoted_semicolons(sql, expected):
+    assert split(sql) == expected
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("select E'\\';' ; x", ["select E'\\';'", "x"]),
+    ("select e'a\\\\'; select 1", ["select e'a\\\\'", "select 1"]),
+    ("select E'it''s;'; select 1", ["select E'it''s;'", "select 1"]),
+    # a trailing E on an identifier is not an escape-string prefix
+    ("select name'x\\'; y", ["select name'x\\'", "y"]),
+])
+def test_escape_strings(sql, expected):
+    assert split(sql) == expected
+
+
+def test_dollar_quoted_bodies():
+    sql = (
+        "create function f() returns int as $$ select 1; $$ language sql;\n"
+        "do $body$\nbegin\n  perform 1; -- $$ inside\nend\n$body$;\n"
+        "select 2"
+    )
+    assert split(sql) == [
+        "create function f() returns int as $$ select 1; $$ language sql",
+        "do $body$\nbegin\n  perform 1; -- $$ inside\nend\n$body$",
+        "select 2",
+    ]
+
+
+def test_comments():
+    assert split("select 1 -- trailing; comment\n; select 2") == ["select 1 -- trailing; comment", "select 2"]
+    assert split("select /* a; */ 1; select 2") == ["select /* a; */ 1", "select 2"]
+    assert split("/* a /* b ; */ ; */ select 1;") == ["/* a /* b ; */ ; */ select 1"]
+    assert split("/* multi\n line; */ select 1") == ["/* multi\n line; */ select 1"]
+
+
+def test_bundled_schema_splits():
+    schema = Path(__file__).resolve().parents[1] / "db" / "schema.postgres.sql"
+    with open(schema, encoding="utf-8") as f:
+        statements = list(iter_sql_statements(f))
+    assert len(statements) == 25
+    assert all(s and not s.endswith(";") for s in statements)
+
+
+class FakeConnection:
+    """Records executed SQL; the index lookup returns one secondary index."""
+
+    closed = False
+
+    def __init__(self):
+        self.sql = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql.append(" ".join(sql.split()))
+
+    def fetchall(self):
+        return [("idx_time_fiscal", "CREATE INDEX idx_time_fiscal ON time_dimension (fiscal_year)")]
+
+    def get_transaction_status(self):
+        return 0
+
+    def commit(self):
+        pass
+
+
+@pytest.mark.parametrize("start, end, bulk, drops", [
+    (date(2026, 1, 1), date(2026, 1, 31), None, False),
+    (date(2015, 1, 1), date(2025, 12, 31), None, True),
+    (date(2026, 1, 1), date(2026, 1, 31), True, True),
+    (date(2015, 1, 1), date(2025, 12, 31), False, False),
+])
+def test_time_dimension_defers_indexes_only_for_bulk(start, end, bulk, drops):
+    conn = FakeConnection()
+    populate_time_dimension_pg(conn, start, end, bulk=bulk)
+    assert any(s.startswith("DROP INDEX idx_time_fiscal") for s in conn.sql) == drops
+    assert any(s.startswith("CREATE INDEX idx_time_fiscal") for s in conn.sql) == drops
+    assert sum(s.startswith("INSERT INTO time_dimension") for s in conn.sql) == 1
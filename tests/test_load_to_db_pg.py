@@ -0,0 +1,29 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from load_to_db_pg import date_keys_from_days, to_days
+
+
+def test_date_keys_from_days_matches_strftime():
+    days = np.arange(np.datetime64("1999-12-25"), np.datetime64("2001-03-05"), dtype="datetime64[D]")
+    keys = date_keys_from_days(days)
+    expected = [int(pd.Timestamp(d).strftime("%Y%m%d")) for d in days]
+    assert keys.dtype == "Int64"
+    assert keys.tolist() == expected
+
+
+def test_date_keys_from_days_missing_and_leap_day():
+    days = np.array(["2024-02-29", "NaT", "1970-01-01", "1969-12-31"], dtype="datetime64[D]")
+    assert date_keys_from_days(days).tolist() == [20240229, pd.NA, 19700101, 19691231]
+
+
+def test_to_days_from_strings_and_arrow_dates():
+    strings = pd.Series(["2015-01-25", "not a date", None])
+    arrow = pd.Series(pd.array([dt.date(2015, 1, 25), None], dtype=pd.ArrowDtype(pa.date32())))
+    stamps = pd.Series(pd.to_datetime(["2015-01-25 13:45"]))
+    assert to_days(strings).astype(str).tolist() == ["2015-01-25", "NaT", "NaT"]
+    assert to_days(arrow).astype(str).tolist() == ["2015-01-25", "NaT"]
+    assert to_days(stamps).astype(str).tolist() == ["2015-01-25"]
@@ -0,0 +1,260 @@
+"""Equivalence tests for the vectorized pandas cleaning steps.
+
+Each step is checked against a row-by-row reference that mirrors the original
+``Series.apply`` implementation, on hand-picked edge cases and on a slice of
+the bundled 2015 transactions file.
+"""
+
+import difflib
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pipeline import pd_pipeline as pp
+from data_pipeline.config import load_config
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "data" / "amazon_india_2015.csv"
+CONFIG = ROOT / "configs" / "cleaning_transactions_amazon_india.json"
+
+
+def values(s: pd.Series) -> list:
+    """Row values with every missing marker as ``None`` and numbers as float."""
+    out = []
+    for v in s.astype(object):
+        if v is None or v is pd.NA or (isinstance(v, float) and math.isnan(v)) or v is pd.NaT:
+            out.append(None)
+        elif isinstance(v, (bool, np.bool_)):
+            out.append(bool(v))
+        elif isinstance(v, (int, float, np.integer, np.floating)):
+            out.append(float(v))
+        else:
+            out.append(v)
+    return out
+
+
+@pytest.fixture(scope="module")
+def sample() -> pd.DataFrame:
+    return pd.read_csv(DATA, nrows=3000)
+
+
+@pytest.fixture(scope="module")
+def cfg():
+    return load_config(str(CONFIG))
+
+
+# ---------- row-wise references ----------
+
+def ref_rating(x):
+    return None if pd.isna(x) else pp._parse_rating_val(str(x))
+
+
+def ref_category(x, fmap):
+    if pd.isna(x):
+        return None
+    s = " ".join(str(x).strip().lower().replace("&", "and").split())
+    return fmap.get(s, s)
+
+
+def ref_city(x, canonical, mappings, threshold):
+    """``(value, resolved)`` for one row, as the original per-row ``fix``."""
+    if x is None or (isinstance(x, float) and math.isnan(x)):
+        return x, False
+    canon_norm = {pp._normalize_city_name(c): c for c in canonical}
+    raw = str(x)
+    if raw in mappings:
+        return mappings[raw], True
+    norm = pp._normalize_city_name(raw)
+    if norm in canon_norm:
+        return canon_norm[norm], True
+    m = difflib.get_close_matches(norm, list(canon_norm), n=1, cutoff=threshold)
+    return (canon_norm[m[0]], True) if m else (x, False)
+
+
+def ref_bool(v):
+    if pd.isna(v):
+        return None
+    if isinstance(v, bool):
+        return v
+    return pp._BOOL_LOOKUP.get(str(v).strip().lower())
+
+
+def ref_payment(v, extra):
+    return v if pd.isna(v) else pp._normalize_payment_val(str(v), extra)
+
+
+def ref_outliers(vals, high_factor, factors):
+    ser = pd.to_numeric(pd.Series(vals), errors="coerce")
+    med = ser.median()
+    flagged = ser > med * high_factor
+    for f in factors:
+        cand = ser / f
+        ok = flagged & cand.between(med / 10, med * 10)
+        ser = ser.where(~ok, cand)
+        flagged &= ~ok
+    return ser, int(flagged.sum())
+
+
+# ---------- helpers ----------
+
+def test_diff_count_treats_shared_missing_as_unchanged():
+    a = pd.Series(["x", None, np.nan, "y", None], dtype=object)
+    b = pd.Series(["x", pd.NA, "z", None, None], dtype="string")
+    assert pp._diff_count(a, b) == 2
+
+
+def test_recode_categories_merges_collisions_and_keeps_missing():
+    s = pd.Series(["B ", "b", None, "a"], dtype="category")
+    labels = s.cat.categories.to_series(index=None).str.strip().str.lower()
+    out = pp._recode_categories(s, labels)
+    assert values(out) == ["b", "b", None, "a"]
+    assert list(out.cat.categories) == ["a", "b"]
+
+
+def test_recode_categories_empty():
+    s = pd.Series([None, None], dtype="category")
+    out = pp._recode_categories(s, s.cat.categories.to_series(index=None))
+    assert values(out) == [None, None]
+
+
+# ---------- steps vs references ----------
+
+RATING_CASES = ["4", " 4.5 ", "4 stars", "5 Star", "3/5", "3 / 4", "7", "0", "0/5", "4/0",
+                "", "  ", None, "abc", "1e1", "+4", "-2", "٤", "2.5stars"]
+
+
+def test_parse_ratings_matches_scalar_parser(sample):
+    s = pd.Series(RATING_CASES + sample["customer_rating"].astype("string").tolist(), dtype="string[pyarrow]")
+    got = pp._parse_ratings(s)
+    assert values(got) == [None if v is None else float(v) for v in map(ref_rating, s.astype(object))]
+
+
+@pytest.mark.parametrize("fmap", [{}, {"home and kitchen": "home", "x y": "xy"}])
+def test_categories_match_rowwise(sample, fmap):
+    raw = [" Home & Kitchen", "home  and kitchen", "x  y", "X Y", "", None, np.nan, 3, 2.5]
+    col = pd.Series(raw + sample["category"].tolist(), dtype=object)
+    df, _ = pp.standardize_categories_pd(pd.DataFrame({"c": col}), ["c"], True, True, True, True, {"c": fmap})
+    assert isinstance(df["c"].dtype, pd.CategoricalDtype)
+    assert values(df["c"]) == [ref_category(x, fmap) for x in col]
+
+
+def test_cities_match_rowwise(sample, cfg):
+    geo = cfg.geo
+    col = pd.Series(["bengaluru ", "BENGALURU", "Mumbay", "Delhi", "Nowhere", None, np.nan]
+                    + sample[geo.city_field].tolist(), dtype=object)
+    df, rep = pp.resolve_cities_pd(pd.DataFrame({"c": col}), "c", geo.canonical_cities, geo.city_mappings,
+                                   geo.fuzzy_threshold)
+    expected = [ref_city(x, geo.canonical_cities, geo.city_mappings, geo.fuzzy_threshold) for x in col]
+    assert values(df["c"]) == values(pd.Series([v for v, _ in expected], dtype=object))
+    assert rep["geo_resolved"] == sum(hit for _, hit in expected)
+
+
+def test_booleans_match_rowwise(sample):
+    col = pd.Series(["Yes", " no ", "Y", "n", "1", "0", 1, 0, True, False, "maybe", None, np.nan]
+                    + sample["is_prime_member"].tolist(), dtype=object)
+    df, rep = pp.standardize_booleans_pd(pd.DataFrame({"c": col}), ["c"])
+    expected = [ref_bool(v) for v in col]
+    assert values(df["c"]) == expected
+    assert rep["booleans_standardized"]["c"] == pp._diff_count(pd.Series(expected, dtype=object), col)
+
+
+def test_booleans_skip_bool_dtype():
+    df = pd.DataFrame({"c": [True, False]})
+    out, rep = pp.standardize_booleans_pd(df, ["c"])
+    assert out["c"].dtype == bool and rep["booleans_standardized"]["c"] == 0
+
+
+def test_delivery_matches_rowwise(sample):
+    col = pd.Series(["Same Day", "sameday", "2-4 days", "5 – 3", "3", " 7 days", "soon", None, np.nan, 12]
+                    + sample["delivery_days"].tolist(), dtype=object)
+    df, _ = pp.standardize_delivery_pd(pd.DataFrame({"c": col}), "c", 10, True)
+    expected = [None if pd.isna(v) else pp._parse_delivery_val(v) for v in col]
+    expected = [None if e is None else float(min(e, 10)) for e in expected]
+    assert values(df["c"]) == expected
+
+
+def test_payment_matches_rowwise(sample, cfg):
+    extra = cfg.payment.extra_mappings
+    col = pd.Series(["PhonePe", "CREDIT_CARD", "c.o.d", "Net Banking", "debit", "Wallet", "???", None]
+                    + sample["payment_method"].tolist(), dtype=object)
+    df, _ = pp.normalize_payment_pd(pd.DataFrame({"c": col}), "c", extra)
+    assert values(df["c"]) == values(pd.Series([ref_payment(v, extra) for v in col], dtype=object))
+
+
+def test_prices_strip_symbols_and_parentheses():
+    col = pd.Series(["₹1,299.50", "(12.50)", "Rs 40", "-3", "n/a", None, 7])
+    df, rep = pp.standardize_prices_pd(pd.DataFrame({"c": col}), ["c"], 1, True)
+    assert values(df["c"]) == [1299.5, -12.5, 40.0, -3.0, None, None, 7.0]
+    assert rep["prices_standardized"]["c"] == 5
+
+
+def test_dates_format_only_parsed_rows():
+    col = pd.Series(["2015-01-25", "25/01/2015", "garbage", None])
+    kept, _ = pp.standardize_dates_pd(pd.DataFrame({"c": col}), ["c"], False, "%Y-%m-%d", ["%d/%m/%Y"])
+    nulled, rep = pp.standardize_dates_pd(pd.DataFrame({"c": col}), ["c"], True, "%Y-%m-%d", ["%d/%m/%Y"])
+    assert values(kept["c"]) == ["2015-01-25", "2015-01-25", "garbage", None]
+    assert values(nulled["c"]) == ["2015-01-25", "2015-01-25", None, None]
+    assert rep["dates_converted"]["c"] == 2
+
+
+@pytest.mark.parametrize("vals", [
+    [10, 12, 11, 1100, 110000, 5_000_000, None],
+    [10, 10, 10, 10**9],
+    [1.0, 2.0, np.nan, 300.0],
+    [-5, -5, 700],
+    ["10", "x", "2000"],
+    [],
+])
+@pytest.mark.parametrize("factors", [[10, 100, 1000], [1000, 10], []])
+def test_outliers_pick_first_valid_factor(vals, factors):
+    want, flagged = ref_outliers(vals, 5, factors)
+    df, rep = pp.correct_outliers_pd(pd.DataFrame({"c": pd.Series(vals, dtype=object)}), "c", 5, factors, 2)
+    assert values(df["c"]) == values(want.round(2))
+    assert rep["flagged"] == flagged
+
+
+def test_dedup_keeps_first_and_aggregates():
+    df = pd.DataFrame({"k": pd.Categorical(["a", "b", "a", None, None]), "q": [1, 2, 3, 4, 5], "v": list("vwxyz")})
+    out, rep = pp.deduplicate_pd(df, ["k"], "q", "first")
+    assert out["v"].tolist() == ["v", "w", "y"] and rep["dropped"] == 2
+    agg, rep = pp.deduplicate_pd(df, ["k"], "q", "aggregate")
+    assert dict(zip(agg["k"].astype(object).where(agg["k"].notna(), None), agg["q"])) == {"a": 4, "b": 2, None: 9}
+
+
+def test_run_cleaning_threads_match_sequential(sample, cfg):
+    seq, seq_rep = pp.run_cleaning_df(sample, cfg)
+    par, par_rep = pp.run_cleaning_df(sample, cfg, workers=4)
+    pd.testing.assert_frame_equal(seq, par)
+    assert seq_rep == par_rep
+    assert list(seq_rep) == list(par_rep)
+
+
+def test_later_steps_accept_categorical_columns():
+    cat = lambda v: pd.DataFrame({"c": pd.Series(v, dtype="category")})
+    cities, rep = pp.resolve_cities_pd(cat(["mumbay", "Mumbai", None, "zz"]), "c", ["Mumbai"], {}, 0.8)
+    assert values(cities["c"]) == ["Mumbai", "Mumbai", None, "zz"] and rep["geo_resolved"] == 2
+    assert list(cities["c"].cat.categories) == ["Mumbai", "zz"]
+    prices, _ = pp.standardize_prices_pd(cat(["₹1", None, "x"]), ["c"], 2, False)
+    assert values(prices["c"]) == [1.0, None, "x"]
+    dates, _ = pp.standardize_dates_pd(cat(["2015-01-25", "x"]), ["c"], False, "%d.%m.%Y", [])
+    assert values(dates["c"]) == ["25.01.2015", "x"]
+
+
+def test_city_field_also_categorical(cfg):
+    # an overlapping config used to crash: the city column reached
+    # resolve_cities_pd as a Categorical
+    raw = pd.read_csv(DATA, nrows=2000)
+    overlap = load_config(str(CONFIG))
+    overlap.categorical.fields = ["category", overlap.geo.city_field]
+    out, rep = pp.run_cleaning_df(raw, overlap)
+    city = out[overlap.geo.city_field]
+    assert isinstance(city.dtype, pd.CategoricalDtype)
+    assert rep["geo"]["geo_resolved"] == 1228
+    # every value is a canonical city or a lowercased original left unresolved
+    lowered = {ref_category(x, {}) for x in raw[overlap.geo.city_field]}
+    assert set(city.dropna()) <= set(overlap.geo.canonical_cities) | set(overlap.geo.city_mappings.values()) | lowered
+    _, par_rep = pp.run_cleaning_df(raw, overlap, workers=4)
+    assert par_rep == rep